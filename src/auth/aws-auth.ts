@@ -5,11 +5,26 @@ import * as fs from "fs";
 import * as path from "path";
 import * as os from "os";
 
+// Throttled calls are retried inside the SDK; adaptive mode also rate-limits the client
+// after a throttle so parallel fan-outs back off together instead of retrying in lockstep
+const CLIENT_RETRY_MODE = "adaptive";
+const CLIENT_MAX_ATTEMPTS = 5;
+
+// Built-in Windows profile directories that never hold a user's .aws folder
+const WINDOWS_SYSTEM_USER_DIRS = new Set([
+  "Public",
+  "Default",
+  "All Users",
+  "Default User",
+]);
+
 export class AWSAuthManager {
   private client: CodeCommitClient | null = null;
   private credentials: AWSCredentials | null = null;
   private config: MCPConfig;
   private refreshTimer: NodeJS.Timeout | null = null;
+  // Resolved once and reused by the periodic refresh; cleared on manual refresh or profile switch
+  private credentialsPath: string | null = null;
 
   constructor(config: MCPConfig) {
     this.config = config;
@@ -106,6 +121,8 @@ export class AWSAuthManager {
       this.client = new CodeCommitClient({
         region: this.config.region || "us-east-1",
         credentials: this.credentials,
+        retryMode: CLIENT_RETRY_MODE,
+        maxAttempts: CLIENT_MAX_ATTEMPTS,
       });
 
       console.error(
@@ -152,6 +169,7 @@ export class AWSAuthManager {
     const oldExpiration =
       this.credentials?.expiration?.toISOString() || "no expiration";
 
+    this.credentialsPath = null;
     await this.loadCredentials(true);
 
     const newExpiration =
@@ -173,6 +191,7 @@ export class AWSAuthManager {
     this.config.awsAccessKeyId = undefined;
     this.config.awsSecretAccessKey = undefined;
     this.config.awsSessionToken = undefined;
+    this.credentialsPath = null;
     await this.loadCredentials();
   }
 
@@ -249,6 +268,10 @@ export class AWSAuthManager {
   }
 
   private getCredentialsPath(): string | null {
+    if (this.credentialsPath && fs.existsSync(this.credentialsPath)) {
+      return this.credentialsPath;
+    }
+
     // Try multiple paths in order of preference
     const pathsToTry = [
       // 1. Standard WSL/Linux home directory
@@ -267,6 +290,7 @@ export class AWSAuthManager {
     for (const credPath of pathsToTry) {
       if (fs.existsSync(credPath)) {
         console.error(`Found AWS credentials at: ${credPath}`);
+        this.credentialsPath = credPath;
         return credPath;
       }
     }
@@ -304,12 +328,7 @@ export class AWSAuthManager {
       if (fs.existsSync(usersDir)) {
         const userDirs = fs.readdirSync(usersDir, { withFileTypes: true });
         for (const dir of userDirs) {
-          if (
-            dir.isDirectory() &&
-            !["Public", "Default", "All Users", "Default User"].includes(
-              dir.name
-            )
-          ) {
+          if (dir.isDirectory() && !WINDOWS_SYSTEM_USER_DIRS.has(dir.name)) {
             paths.push(path.join(usersDir, dir.name));
           }
         }
@@ -15,6 +15,1061 @@ import { MCPConfig } from "./types/index.js";
 import { handleAWSError, retryWithBackoff } from "./utils/error-handler.js";
 import { createPaginationOptions } from "./utils/pagination.js";
 import { IntelligentDiffAnalyzer } from "./utils/intelligent-diff-analyzer.js";
+import {
+  clampLongLines,
+  formatWithLineNumbers,
+  getLineStarts,
+  sliceFileLines,
+} from "./utils/file-content.js";
+
+// Static guidance attached to file_get responses, built once rather than per call
+const DIFF_CHUNKING_INSTRUCTIONS = {
+  useParameters:
+    "chunkOffset (starting hunk number, 1-based) and chunkLimit (number of hunks)",
+  example: "chunkOffset: 1, chunkLimit: 5 for first 5 hunks",
+  recommendedChunkSize: "3-5 hunks per request for optimal performance",
+};
+
+const LARGE_FILE_DIFF_GUIDANCE = {
+  suggestion:
+    "File too large for full content. Use code_search to find specific patterns in this file.",
+  alternatives: [
+    "Use code_search in 'search' mode with this file path to find specific functions/classes",
+    "Use code_search in 'tree' mode to explore related smaller files",
+  ],
+};
+
+const DIFF_ONLY_GUIDANCE = {
+  suggestion:
+    "If diff doesn't provide enough context, use file_get without beforeCommitId for full content",
+  alternatives: [
+    "Use code_search in 'search' mode to find specific patterns in this file",
+    "Use code_search in 'tree' mode to explore related files",
+  ],
+};
+
+const CONTENT_CHUNKING_INSTRUCTIONS = {
+  useParameters:
+    "chunkOffset (starting line number, 1-based) and chunkLimit (number of lines)",
+  example: "chunkOffset: 1, chunkLimit: 500 for first 500 lines",
+  recommendedChunkSize: "500-1000 lines per request for optimal performance",
+};
+
+// Response status per GetDifferences change type
+const CHANGE_STATUS = {
+  A: "FILE_ADDED",
+  D: "FILE_DELETED",
+  M: "FILE_MODIFIED",
+} as const;
+
+const CHANGE_LABELS = {
+  A: "Added (A)",
+  D: "Deleted (D)",
+  M: "Modified (M)",
+} as const;
+
+/**
+ * Wraps a tool result as the pretty-printed JSON text content every handler returns.
+ */
+function jsonResult(value: unknown) {
+  return {
+    content: [{ type: "text" as const, text: JSON.stringify(value, null, 2) }],
+  };
+}
+
+// Static tool catalog; built once at load and returned as-is for every ListTools request
+const TOOLS = [
+  // RECOMMENDED PR REVIEW WORKFLOW:
+  // 1. repos_list → find repository
+  // 2. prs_list → find PR
+  // 3. pr_get → get PR details like repo name & extract mergeBase + sourceCommit from targets[0] for the given pr id
+  // 4. diff_get → identify changed files (use mergeBase as beforeCommitSpecifier)
+  // 5. batch_diff_analyze → get intelligent recommendations for all files (max 3-5 files per call)
+  // 6. Based on recommendations:
+  //    - file_diff_analyze → for detailed git diff analysis (diff format only)
+  //    - file_get WITHOUT beforeCommitId → for full file content when diff lacks context
+  //    - code_search → to find specific patterns within files or explore repository structure
+  // 7. comment_post → add reviews (use mergeBase as beforeCommitId for line accuracy)
+  //
+  // IMPORTANT: All diff tools return ONLY git diff format. Use file_get without beforeCommitId for full content.
+  // This workflow ensures efficient, strategic analysis with proper context when needed.
+
+  // Repository Management Tools
+  {
+    name: "repos_list",
+    description:
+      "Lists all AWS CodeCommit repositories you have access to. Use this when: 1) User asks about repositories, 2) Need to find a specific repo details by name. Returns repository metadata including name, ID, description, default branch, creation date, and clone URLs. Supports search filtering and pagination for large lists. Essential first step for any repository operations.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        searchTerm: {
+          type: "string",
+          description:
+            "Filter repositories by name or description (case-insensitive substring match). Use when user mentions a specific repo name or wants to find repos containing certain keywords.",
+        },
+        nextToken: {
+          type: "string",
+          description:
+            "Pagination token from previous response. Only use when you need to fetch more results after receiving a nextToken in the response.",
+        },
+        maxResults: {
+          type: "number",
+          description:
+            "Number of repositories to return (1-1000). Default 100. Use smaller values for quick overviews, larger for comprehensive lists.",
+        },
+      },
+    },
+  },
+  {
+    name: "repo_get",
+    description:
+      "Gets detailed information about a specific repository including metadata, default branch, clone URLs, creation date, and description. Use this when: 1) User asks about a specific repository, 2) Need repo details, 3) Want to show repo information. Provides complete repository context needed for code review and PR operations.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        repositoryName: {
+          type: "string",
+          description:
+            "Exact name of the AWS CodeCommit repository. Must match exactly as shown in repository listings. Required for all repository-specific operations.",
+        },
+      },
+      required: ["repositoryName"],
+    },
+  },
+  {
+    name: "branches_list",
+    description:
+      "Lists all branches in a repository with their latest commit IDs. Use this when: 1) To see available branches, 2) User asks about branches, 3) Need to find source/target branches for PRs, 4) Checking branch structure. Essential for understanding repository branch topology and selecting correct branches for comparisons and PRs.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        repositoryName: {
+          type: "string",
+          description:
+            "Repository name to list branches from. Must be exact repository name from repo listings.",
+        },
+        nextToken: {
+          type: "string",
+          description:
+            "Pagination token for fetching additional branches if repository has many branches.",
+        },
+      },
+      required: ["repositoryName"],
+    },
+  },
+  {
+    name: "branch_get",
+    description:
+      "Gets detailed information about a specific branch including its latest commit ID and commit details. Use when: 1) Need specific branch information, 2) Want to see latest commit on a branch, 3) Validating branch exists before creating PRs. Provides branch head commit ID needed for PR operations and comparisons.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        repositoryName: {
+          type: "string",
+          description: "Repository containing the branch",
+        },
+        branchName: {
+          type: "string",
+          description:
+            'Exact branch name (e.g., "main", "develop", "feature/new-feature"). Case-sensitive and must match exactly.',
+        },
+      },
+      required: ["repositoryName", "branchName"],
+    },
+  },
+  {
+    name: "file_get",
+    description:
+      "Retrieves file content with two distinct modes: 1) WITH beforeCommitId: Returns ONLY git diff format (no file content) - use for seeing what changed. 2) WITHOUT beforeCommitId: Returns full file content with line numbers - use when you need complete context beyond diff (understanding imports, class structure, function relationships, etc.). For code review: Start with diff tools, then use file_get WITHOUT beforeCommitId when diff alone doesn't provide enough context for proper analysis. Line numbers match AWS Console exactly.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        repositoryName: {
+          type: "string",
+          description: "Repository containing the file",
+        },
+        commitSpecifier: {
+          type: "string",
+          description:
+            'Branch name (e.g., "main", "develop") or specific commit ID. Use branch names for latest version, commit IDs for specific versions.',
+        },
+        filePath: {
+          type: "string",
+          description:
+            'Full path to file from repository root (e.g., "src/main.py", "docs/README.md"). Use forward slashes, no leading slash.',
+        },
+        beforeCommitId: {
+          type: "string",
+          description:
+            "REQUIRED for modified files (M): Base commit ID to compare against (typically mergeBase from PR targets). When provided, response includes both numbered file content AND comprehensive diff analysis showing exactly which lines were added, removed, or modified. This is essential for understanding what changed in the files for accurate code review.",
+        },
+        includeLineNumbers: {
+          type: "boolean",
+          description:
+            "Optional: Include line numbers in file content (default: true). Line numbers match AWS Console display exactly for accurate comment positioning.",
+        },
+        chunkOffset: {
+          type: "number",
+          description:
+            "Optional: Starting line number for chunked response (1-based). Use with chunkLimit for large files. For diff chunking, this represents the hunk number.",
+        },
+        chunkLimit: {
+          type: "number",
+          description:
+            "Optional: Maximum number of lines to return starting from chunkOffset. For diff chunking, this represents number of hunks to return. Use 500-1000 for optimal performance.",
+        },
+      },
+      required: ["repositoryName", "commitSpecifier", "filePath"],
+    },
+  },
+  {
+    name: "folder_get",
+    description:
+      "Lists all files and subdirectories in a folder at specific commit/branch. Essential for: 1) Exploring repository structure, 2) Finding files for review, 3) Understanding project organization, 4) Discovering relevant files for PRs. Returns list of files with paths, blob IDs, and file modes. Use to navigate repository structure before detailed file analysis.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        repositoryName: {
+          type: "string",
+          description: "Repository to explore",
+        },
+        commitSpecifier: {
+          type: "string",
+          description:
+            "Branch name or commit ID to get folder contents from",
+        },
+        folderPath: {
+          type: "string",
+          description:
+            'Path to folder from repository root (e.g., "src", "docs/api", ""). Use empty string for root directory.',
+        },
+      },
+      required: ["repositoryName", "commitSpecifier", "folderPath"],
+    },
+  },
+  {
+    name: "code_search",
+    description:
+      "Advanced code search and repository exploration tool. TWO MAIN MODES: 1) SEARCH MODE: Search for patterns within a specific file (REQUIRED: exact file path). Find functions, classes, imports, variables using regex or literal strings. Use when diff shows changes but you need to understand the broader context within that specific file. 2) TREE MODE: Display repository structure in formatted tree view to explore project organization and find files. Essential for understanding codebase structure when diff analysis lacks context.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        repositoryName: {
+          type: "string",
+          description: "Repository to search in",
+        },
+        commitSpecifier: {
+          type: "string",
+          description:
+            "Branch name or commit ID to search at (e.g., 'main', 'develop', or specific commit ID)",
+        },
+        mode: {
+          type: "string",
+          enum: ["search", "tree"],
+          description:
+            "Operation mode: 'search' for code pattern searching, 'tree' for repository structure listing",
+        },
+        filePath: {
+          type: "string",
+          description:
+            "Required for search mode. Exact file path to search within (e.g., 'src/main.js', 'components/Header.tsx')",
+        },
+        searchPatterns: {
+          type: "array",
+          description:
+            "Required for search mode. Array of search patterns to find within the specified file",
+          items: {
+            type: "object",
+            properties: {
+              pattern: {
+                type: "string",
+                description:
+                  "Search pattern - regex (/pattern/flags), function name, class name, or literal string",
+              },
+              type: {
+                type: "string",
+                enum: [
+                  "regex",
+                  "literal",
+                  "function",
+                  "class",
+                  "import",
+                  "variable",
+                ],
+                description:
+                  "Search type: regex for complex patterns, literal for exact text, function/class for definitions, import for dependencies",
+              },
+              caseSensitive: {
+                type: "boolean",
+                description: "Case sensitive search (default: false)",
+              },
+            },
+            required: ["pattern", "type"],
+          },
+        },
+        treePath: {
+          type: "string",
+          description:
+            "For tree mode: Root path to list (default: repository root). Use '/' for root or 'src/' for specific folder",
+        },
+        treeDepth: {
+          type: "number",
+          description:
+            "For tree mode: Maximum depth to show (default: 10). Use 1 for top-level only, 2 for one level deep, etc. Trees longer than 2000 lines are truncated; narrow treePath or treeDepth to page through large repositories.",
+        },
+        maxResults: {
+          type: "number",
+          description:
+            "For search mode: Maximum results per pattern (default: 50, max: 200)",
+        },
+        includeContext: {
+          type: "boolean",
+          description:
+            "For search mode: Include surrounding lines (default: true)",
+        },
+        contextLines: {
+          type: "number",
+          description:
+            "For search mode: Context lines before/after match (default: 3, max: 10)",
+        },
+        excludePaths: {
+          type: "array",
+          items: { type: "string" },
+          description:
+            "Paths to exclude (e.g., ['node_modules', 'dist', '.git'])",
+        },
+      },
+      required: ["repositoryName", "commitSpecifier", "mode"],
+    },
+  },
+  {
+    name: "commit_get",
+    description:
+      "Gets comprehensive details about a specific commit including message, author, committer, timestamp, parent commits, and tree ID. Use when: 1) Analyzing commit in PR, 2) Understanding commit history, 3) Getting commit metadata for review, 4) Investigating specific changes. Provides full commit context needed for thorough code review.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        repositoryName: {
+          type: "string",
+          description: "Repository containing the commit",
+        },
+        commitId: {
+          type: "string",
+          description:
+            "Full commit SHA ID (40-character hex string). Get from branch info, PR details, or git history.",
+        },
+      },
+      required: ["repositoryName", "commitId"],
+    },
+  },
+  {
+    name: "diff_get",
+    description:
+      "Gets high-level file differences between commits/branches showing which files changed (A/D/M) with paths and blob IDs. ESSENTIAL FIRST STEP for PR reviews. After this, use batch_diff_analyze to see what changed in multiple files (git diff only). If diffs don't provide enough context, use file_get without beforeCommitId for full file content, or code_search to find related patterns.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        repositoryName: {
+          type: "string",
+          description: "Repository to compare",
+        },
+        beforeCommitSpecifier: {
+          type: "string",
+          description:
+            "Base commit/branch (what you're comparing FROM). For PR reviews, use mergeBase from PR targets, not destinationCommit.",
+        },
+        afterCommitSpecifier: {
+          type: "string",
+          description:
+            "Compare commit/branch (what you're comparing TO). For PR reviews, use sourceCommit from PR targets.",
+        },
+        beforePath: {
+          type: "string",
+          description:
+            "Optional: Filter differences to specific path in before commit. Use to focus on specific directories or files.",
+        },
+        afterPath: {
+          type: "string",
+          description:
+            "Optional: Filter differences to specific path in after commit. Use to focus on specific directories or files.",
+        },
+        nextToken: {
+          type: "string",
+          description:
+            "Pagination token for large changesets with many file differences.",
+        },
+        maxResults: {
+          type: "number",
+          description:
+            "Optional: Differences per page (default: 100). When set, only the requested page is fetched, so a small value answers whether matching files changed (e.g. with afterPath set) in one call.",
+        },
+      },
+      required: [
+        "repositoryName",
+        "beforeCommitSpecifier",
+        "afterCommitSpecifier",
+      ],
+    },
+  },
+  {
+    name: "file_diff_analyze",
+    description:
+      "Returns ONLY git diff format for a single file - no file content. Shows what changed with precise line numbers. For deleted files, returns deletion confirmation only. WHEN DIFF IS NOT ENOUGH: If you need more context beyond the diff (imports, function definitions, class structure), use file_get WITHOUT beforeCommitId to get full file content, or use code_search to find specific code patterns. For new files, consider using file_get to see full structure if diff alone doesn't provide enough context for review.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        repositoryName: {
+          type: "string",
+          description: "Repository containing the file",
+        },
+        beforeCommitId: {
+          type: "string",
+          description:
+            "Commit ID to compare from (use mergeBase from PR for accurate line mapping)",
+        },
+        afterCommitId: {
+          type: "string",
+          description:
+            "Commit ID to compare to (use sourceCommit from PR)",
+        },
+        filePath: {
+          type: "string",
+          description: "Path to the specific file to analyze",
+        },
+        changeType: {
+          type: "string",
+          enum: ["A", "D", "M"],
+          description:
+            "Change type from diff_get: A=Added, D=Deleted, M=Modified",
+        },
+      },
+      required: [
+        "repositoryName",
+        "beforeCommitId",
+        "afterCommitId",
+        "filePath",
+        "changeType",
+      ],
+    },
+  },
+  {
+    name: "batch_diff_analyze",
+    description:
+      "Returns ONLY git diff format for multiple files (3-5 max) - no file content. Shows what changed in each file. For deleted files, shows deletion status only. WHEN DIFFS ARE NOT ENOUGH: If any file's diff lacks context for proper review (missing imports, unclear function relationships, complex logic), use file_get without beforeCommitId for full content, or use code_search to find related code patterns across the repository. Provides strategic guidance on which files may need additional context.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        repositoryName: {
+          type: "string",
+          description: "Repository name",
+        },
+        beforeCommitId: {
+          type: "string",
+          description:
+            "Base commit ID (use mergeBase from PR targets for accurate analysis)",
+        },
+        afterCommitId: {
+          type: "string",
+          description:
+            "Compare commit ID (use sourceCommit from PR targets)",
+        },
+        fileDifferences: {
+          type: "array",
+          description:
+            "Array of file differences from diff_get response",
+          items: {
+            type: "object",
+            properties: {
+              changeType: { type: "string", enum: ["A", "D", "M"] },
+              beforeBlob: {
+                type: "object",
+                properties: {
+                  path: { type: "string" },
+                  blobId: { type: "string" },
+                },
+              },
+              afterBlob: {
+                type: "object",
+                properties: {
+                  path: { type: "string" },
+                  blobId: { type: "string" },
+                },
+              },
+            },
+          },
+        },
+      },
+      required: [
+        "repositoryName",
+        "beforeCommitId",
+        "afterCommitId",
+        "fileDifferences",
+      ],
+    },
+  },
+
+  // Pull Request Management Tools
+  {
+    name: "prs_list",
+    description:
+      "Lists pull requests in a repository by status (OPEN/CLOSED). Use when: 1) Starting review session to see active PRs, 2) User asks about PRs, 3) Finding specific PR to review, 4) Getting overview of repository PR activity. Returns PR IDs that you must use with pr_get to get full details. Always follow with pr_get for each PR you need to analyze.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        repositoryName: {
+          type: "string",
+          description: "Repository to list PRs from",
+        },
+        pullRequestStatus: {
+          type: "string",
+          enum: ["OPEN", "CLOSED"],
+          description:
+            "OPEN for active PRs needing review, CLOSED for completed/abandoned PRs. Use OPEN by default for review workflow.",
+        },
+        nextToken: {
+          type: "string",
+          description:
+            "Pagination token for repositories with many PRs",
+        },
+      },
+      required: ["repositoryName"],
+    },
+  },
+  {
+    name: "pr_get",
+    description:
+      "Gets complete PR details with critical commit IDs needed for accurate analysis. ESSENTIAL SECOND STEP after prs_list. Provides mergeBase (use for beforeCommitId in diff analysis) and sourceCommit/destinationCommit from targets array. Extract these commit IDs to use with diff_get → batch_diff_analyze → targeted file analysis workflow. The foundation for all subsequent PR analysis - provides the commit references that ensure accurate line mapping and change detection.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        pullRequestId: {
+          type: "string",
+          description:
+            'PR ID from prs_list or user reference. Usually numeric string like "123" or "45".',
+        },
+      },
+      required: ["pullRequestId"],
+    },
+  },
+  {
+    name: "pr_create",
+    description:
+      "Creates a new pull request from source branch to destination branch. Use when: 1) User wants to create PR, 2) Proposing code changes, 3) Starting review process for branch changes. Requires clear title, description, and valid source/destination branches. Returns created PR details with ID for further operations.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        repositoryName: {
+          type: "string",
+          description: "Repository to create PR in",
+        },
+        title: {
+          type: "string",
+          description:
+            'Clear, descriptive PR title summarizing the changes (e.g., "Add user authentication feature", "Fix memory leak in parser")',
+        },
+        description: {
+          type: "string",
+          description:
+            "Detailed PR description explaining what changed, why, testing done, etc. Should provide context for reviewers.",
+        },
+        sourceReference: {
+          type: "string",
+          description:
+            'Source branch name containing changes to merge (e.g., "feature/auth", "bugfix/parser"). Must exist and have commits ahead of target.',
+        },
+        destinationReference: {
+          type: "string",
+          description:
+            'Target branch to merge into (e.g., "main", "develop"). Usually main development branch.',
+        },
+        clientRequestToken: {
+          type: "string",
+          description:
+            "Optional unique token to prevent duplicate PR creation. Use UUID or timestamp if provided.",
+        },
+      },
+      required: [
+        "repositoryName",
+        "title",
+        "sourceReference",
+        "destinationReference",
+      ],
+    },
+  },
+  {
+    name: "pr_update_title",
+    description:
+      "Updates pull request title. Use when: 1) PR title needs correction, 2) Title doesn't reflect changes, 3) User requests title change. Automatically updates PR and returns updated PR details. Use clear, descriptive titles that summarize the changes.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        pullRequestId: {
+          type: "string",
+          description: "PR ID to update title for",
+        },
+        title: {
+          type: "string",
+          description:
+            "New title that clearly describes the PR changes",
+        },
+      },
+      required: ["pullRequestId", "title"],
+    },
+  },
+  {
+    name: "pr_update_desc",
+    description:
+      "Updates pull request description. Use when: 1) PR description needs more detail, 2) Changes in scope/approach, 3) Adding context for reviewers. Provide comprehensive description explaining what changed, why, how to test, and any notes for reviewers.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        pullRequestId: {
+          type: "string",
+          description: "PR ID to update description for",
+        },
+        description: {
+          type: "string",
+          description:
+            "New detailed description providing context, rationale, testing notes, and reviewer guidance",
+        },
+      },
+      required: ["pullRequestId", "description"],
+    },
+  },
+  {
+    name: "pr_close",
+    description:
+      "Closes a pull request without merging. Use when: 1) PR is abandoned/obsolete, 2) Changes no longer needed, 3) Superseded by another PR, 4) User requests closure. Permanently closes PR - cannot be merged after closing but can be reopened if needed.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        pullRequestId: {
+          type: "string",
+          description: "PR ID to close",
+        },
+      },
+      required: ["pullRequestId"],
+    },
+  },
+  {
+    name: "pr_reopen",
+    description:
+      "Reopens a previously closed pull request. Use when: 1) Closed PR needs to be active again, 2) Premature closure, 3) Reviving abandoned changes. Only works on closed PRs - cannot reopen merged PRs.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        pullRequestId: {
+          type: "string",
+          description: "Previously closed PR ID to reopen",
+        },
+      },
+      required: ["pullRequestId"],
+    },
+  },
+
+  // Comment and Review Tools
+  {
+    name: "comments_get",
+    description:
+      "Gets all comments on a pull request including general comments and line-specific comments. CRITICAL for PR review workflow. Use when: 1) Starting PR review to see existing feedback, 2) Understanding review conversation, 3) Checking if issues already raised. AWS API has conditional requirements: 1) Simple usage: Only provide pullRequestId to get ALL comments for the PR, 2) Filtered usage: Provide pullRequestId + repositoryName + beforeCommitId + afterCommitId together to filter comments by specific commit range.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        pullRequestId: {
+          type: "string",
+          description: "PR ID to get comments from",
+        },
+        repositoryName: {
+          type: "string",
+          description:
+            "Optional: Repository containing the PR. When provided, BOTH beforeCommitId and afterCommitId must also be provided to filter comments by commit range.",
+        },
+        beforeCommitId: {
+          type: "string",
+          description:
+            "Optional: Before commit ID to filter comments to specific commit range. REQUIRED if repositoryName is provided. Use destinationCommit from PR details (tip of destination branch when PR was created).",
+        },
+        afterCommitId: {
+          type: "string",
+          description:
+            "Optional: After commit ID to filter comments to specific commit range. REQUIRED if repositoryName is provided. Use sourceCommit from PR details (tip of source branch when comment was made).",
+        },
+        nextToken: {
+          type: "string",
+          description: "Pagination for PRs with many comments",
+        },
+      },
+      required: ["pullRequestId"],
+    },
+  },
+  {
+    name: "comment_post",
+    description:
+      "Posts a comment on pull request - either general PR comment or line-specific code comment. Use when: 1) Providing PR feedback, 2) Asking questions about changes, 3) Suggesting improvements, 4) Highlighting specific code issues. Can post on specific lines by providing filePath and filePosition for targeted feedback.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        pullRequestId: {
+          type: "string",
+          description: "PR ID to comment on",
+        },
+        repositoryName: {
+          type: "string",
+          description: "Repository containing the PR",
+        },
+        beforeCommitId: {
+          type: "string",
+          description:
+            "Before commit ID from PR details. For line-specific comments, use mergeBase from PR targets. For general comments, use destinationCommit. Required for all comments.",
+        },
+        afterCommitId: {
+          type: "string",
+          description:
+            "After commit ID from PR details. Use sourceCommit from PR targets. Required for all comments.",
+        },
+        content: {
+          type: "string",
+          description:
+            "Comment text. Be specific, constructive, and helpful. For line comments, reference the specific code issue.",
+        },
+        filePath: {
+          type: "string",
+          description:
+            'Optional: File path for line-specific comment (e.g., "src/main.py"). Omit for general PR comment. When provided, filePosition and relativeFileVersion must also be provided.',
+        },
+        filePosition: {
+          type: "number",
+          description:
+            "Optional: Line number for line-specific comment. REQUIRED if filePath is provided. Use with filePath for precise code feedback.",
+        },
+        relativeFileVersion: {
+          type: "string",
+          enum: ["BEFORE", "AFTER"],
+          description:
+            "Optional: BEFORE for original file version, AFTER for changed file version. REQUIRED if filePath is provided. Use AFTER for comments on new code.",
+        },
+        clientRequestToken: {
+          type: "string",
+          description:
+            "Optional: Unique token to prevent duplicate comments",
+        },
+      },
+      required: [
+        "pullRequestId",
+        "repositoryName",
+        "beforeCommitId",
+        "afterCommitId",
+        "content",
+      ],
+    },
+  },
+  {
+    name: "comment_update",
+    description:
+      "Updates existing comment content. Use when: 1) Comment needs correction, 2) Adding more information, 3) Clarifying feedback. Can edit your own comments to improve clarity or add details after further analysis.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        commentId: {
+          type: "string",
+          description: "Comment ID from comments_get response",
+        },
+        content: {
+          type: "string",
+          description:
+            "Updated comment content with corrections or additional information",
+        },
+      },
+      required: ["commentId", "content"],
+    },
+  },
+  {
+    name: "comment_delete",
+    description:
+      "Deletes a comment (marks as deleted, preserves comment thread structure). Use when: 1) Comment is incorrect/inappropriate, 2) No longer relevant, 3) Duplicate feedback. Use sparingly - editing is usually better than deleting.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        commentId: {
+          type: "string",
+          description: "Comment ID to delete",
+        },
+      },
+      required: ["commentId"],
+    },
+  },
+  {
+    name: "comment_reply",
+    description:
+      "Replies to an existing comment, creating a threaded conversation. Use when: 1) Responding to questions, 2) Continuing discussion, 3) Addressing feedback, 4) Clarifying points. Maintains comment thread context for organized discussions.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        pullRequestId: {
+          type: "string",
+          description: "PR containing the original comment",
+        },
+        repositoryName: {
+          type: "string",
+          description: "Repository containing the PR",
+        },
+        beforeCommitId: {
+          type: "string",
+          description:
+            "Before commit ID from PR details. Use mergeBase from PR targets.",
+        },
+        afterCommitId: {
+          type: "string",
+          description:
+            "After commit ID from PR details. Use sourceCommit from PR targets.",
+        },
+        inReplyTo: {
+          type: "string",
+          description:
+            "Comment ID you're replying to (from comments_get)",
+        },
+        content: {
+          type: "string",
+          description: "Reply content addressing the original comment",
+        },
+        clientRequestToken: {
+          type: "string",
+          description: "Optional: Unique token for reply",
+        },
+      },
+      required: [
+        "pullRequestId",
+        "repositoryName",
+        "beforeCommitId",
+        "afterCommitId",
+        "inReplyTo",
+        "content",
+      ],
+    },
+  },
+
+  // Approval and Review State Tools
+  {
+    name: "approvals_get",
+    description:
+      "Gets current approval states for a pull request showing who approved/revoked and current status. Use when: 1) Checking if PR ready to merge, 2) Understanding approval status, 3) Seeing who reviewed. Critical for merge decisions and understanding PR approval workflow.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        pullRequestId: {
+          type: "string",
+          description: "PR ID to check approvals for",
+        },
+        revisionId: {
+          type: "string",
+          description:
+            "PR revision ID from pr_get response. Approvals are tied to specific revisions.",
+        },
+      },
+      required: ["pullRequestId", "revisionId"],
+    },
+  },
+  {
+    name: "approval_set",
+    description:
+      "Approve or revoke approval for a pull request. Use when: 1) PR looks good and ready to merge (APPROVE), 2) Found issues and withdrawing approval (REVOKE), 3) Completing code review process. Your approval/revoke affects whether PR can be merged based on approval rules.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        pullRequestId: {
+          type: "string",
+          description: "PR ID to approve or revoke",
+        },
+        revisionId: {
+          type: "string",
+          description: "PR revision ID from pr_get response",
+        },
+        approvalStatus: {
+          type: "string",
+          enum: ["APPROVE", "REVOKE"],
+          description:
+            "APPROVE if code review passed and PR ready to merge, REVOKE if issues found or approval withdrawn",
+        },
+      },
+      required: ["pullRequestId", "revisionId", "approvalStatus"],
+    },
+  },
+  {
+    name: "approval_rules_check",
+    description:
+      "Evaluates if pull request meets all approval rules (required approvers, approval counts, etc.). Use when: 1) Checking if PR can be merged, 2) Understanding why PR blocked, 3) Validating approval requirements. Shows which rules are satisfied and which need attention.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        pullRequestId: {
+          type: "string",
+          description: "PR ID to evaluate approval rules for",
+        },
+        revisionId: {
+          type: "string",
+          description: "PR revision ID from pr_get response",
+        },
+      },
+      required: ["pullRequestId", "revisionId"],
+    },
+  },
+
+  // Merge Management Tools
+  {
+    name: "merge_conflicts_check",
+    description:
+      "Checks for merge conflicts between source and destination branches before attempting merge. Use when: 1) Before merging PR, 2) Understanding why merge failed, 3) Planning conflict resolution. Shows if merge is clean or has conflicts requiring resolution.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        repositoryName: {
+          type: "string",
+          description: "Repository containing the branches",
+        },
+        destinationCommitSpecifier: {
+          type: "string",
+          description:
+            'Target branch or commit (e.g., "main", "develop") that changes will merge into',
+        },
+        sourceCommitSpecifier: {
+          type: "string",
+          description:
+            "Source branch or commit containing changes to merge",
+        },
+        mergeOption: {
+          type: "string",
+          enum: [
+            "FAST_FORWARD_MERGE",
+            "SQUASH_MERGE",
+            "THREE_WAY_MERGE",
+          ],
+          description:
+            "Merge strategy: FAST_FORWARD_MERGE (linear), SQUASH_MERGE (single commit), THREE_WAY_MERGE (preserve history)",
+        },
+      },
+      required: [
+        "repositoryName",
+        "destinationCommitSpecifier",
+        "sourceCommitSpecifier",
+        "mergeOption",
+      ],
+    },
+  },
+  {
+    name: "merge_options_get",
+    description:
+      "Gets available merge strategies for a pull request based on branch relationship and repository settings. Use when: 1) Planning PR merge, 2) Understanding merge options, 3) Before attempting merge. Shows which merge types (fast-forward, squash, three-way) are available.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        repositoryName: {
+          type: "string",
+          description: "Repository containing the PR",
+        },
+        sourceCommitSpecifier: {
+          type: "string",
+          description: "Source branch/commit from PR details",
+        },
+        destinationCommitSpecifier: {
+          type: "string",
+          description: "Destination branch/commit from PR details",
+        },
+      },
+      required: [
+        "repositoryName",
+        "sourceCommitSpecifier",
+        "destinationCommitSpecifier",
+      ],
+    },
+  },
+  {
+    name: "pr_merge",
+    description:
+      "Merges an approved pull request using specified merge strategy. Use when: 1) PR approved and ready to merge, 2) No conflicts exist, 3) All approval rules satisfied. IMPORTANT: This permanently merges changes into target branch. Verify approval status first.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        pullRequestId: {
+          type: "string",
+          description: "Approved PR ID to merge",
+        },
+        repositoryName: {
+          type: "string",
+          description: "Repository containing the PR",
+        },
+        mergeOption: {
+          type: "string",
+          enum: [
+            "FAST_FORWARD_MERGE",
+            "SQUASH_MERGE",
+            "THREE_WAY_MERGE",
+          ],
+          description:
+            "FAST_FORWARD_MERGE: linear history, SQUASH_MERGE: single commit, THREE_WAY_MERGE: preserve branch history",
+        },
+        commitMessage: {
+          type: "string",
+          description:
+            "Optional: Custom merge commit message. Use for SQUASH_MERGE and THREE_WAY_MERGE to describe the merge.",
+        },
+        authorName: {
+          type: "string",
+          description: "Optional: Author name for merge commit",
+        },
+        email: {
+          type: "string",
+          description: "Optional: Author email for merge commit",
+        },
+      },
+      required: ["pullRequestId", "repositoryName", "mergeOption"],
+    },
+  },
+
+  // AWS Credential Management Tools
+  {
+    name: "aws_creds_refresh",
+    description:
+      "Manually refreshes AWS credentials (normally auto-refreshed every 7.5 hours). Use when: 1) Credentials expired, 2) Getting authentication errors, 3) Switched AWS configuration, 4) Testing credential validity. Reloads from configured source (profile/environment).",
+    inputSchema: {
+      type: "object",
+      properties: {},
+    },
+  },
+  {
+    name: "aws_profile_switch",
+    description:
+      "Switches to different AWS profile for accessing different AWS accounts/roles. Use when: 1) Need to access different AWS account, 2) Switch between environments (dev/prod), 3) Use different IAM roles. Automatically refreshes credentials for new profile.",
+    inputSchema: {
+      type: "object",
+      properties: {
+        profileName: {
+          type: "string",
+          description:
+            'AWS profile name from ~/.aws/credentials or ~/.aws/config (e.g., "default", "production", "dev")',
+        },
+      },
+      required: ["profileName"],
+    },
+  },
+  {
+    name: "aws_profiles_list",
+    description:
+      "Lists all available AWS profiles configured in ~/.aws/credentials. Use when: 1) User wants to switch profiles, 2) Checking available AWS accounts, 3) Troubleshooting authentication. Shows profile names that can be used with aws_profile_switch.",
+    inputSchema: {
+      type: "object",
+      properties: {},
+    },
+  },
+  {
+    name: "aws_creds_status",
+    description:
+      "Shows current AWS credentials status including validity, expiration time, and access key info. Use when: 1) Troubleshooting authentication issues, 2) Checking if credentials expired, 3) Verifying correct AWS account. Helps diagnose credential-related problems.",
+    inputSchema: {
+      type: "object",
+      properties: {},
+    },
+  },
+] as Tool[];
 
 class AWSPRReviewerServer {
   private server: Server;
@@ -33,1016 +1088,31 @@ class AWSPRReviewerServer {
         capabilities: {
           tools: {},
         },
-      }
-    );
-
-    const config: MCPConfig = {
-      awsProfile: process.env.AWS_PROFILE,
-      awsAccessKeyId: process.env.AWS_ACCESS_KEY_ID,
-      awsSecretAccessKey: process.env.AWS_SECRET_ACCESS_KEY,
-      awsSessionToken: process.env.AWS_SESSION_TOKEN,
-      region: process.env.AWS_REGION || "us-east-1",
-    };
-
-    this.authManager = new AWSAuthManager(config);
-    this.repositoryService = new RepositoryService(this.authManager);
-    this.pullRequestService = new PullRequestService(this.authManager);
-    this.diffAnalyzer = new IntelligentDiffAnalyzer(this.repositoryService);
-
-    this.setupToolHandlers();
-  }
-
-  private setupToolHandlers() {
-    this.server.setRequestHandler(ListToolsRequestSchema, async () => {
-      return {
-        tools: [
-          // RECOMMENDED PR REVIEW WORKFLOW:
-          // 1. repos_list → find repository
-          // 2. prs_list → find PR
-          // 3. pr_get → get PR details like repo name & extract mergeBase + sourceCommit from targets[0] for the given pr id
-          // 4. diff_get → identify changed files (use mergeBase as beforeCommitSpecifier)
-          // 5. batch_diff_analyze → get intelligent recommendations for all files (max 3-5 files per call)
-          // 6. Based on recommendations:
-          //    - file_diff_analyze → for detailed git diff analysis (diff format only)
-          //    - file_get WITHOUT beforeCommitId → for full file content when diff lacks context
-          //    - code_search → to find specific patterns within files or explore repository structure
-          // 7. comment_post → add reviews (use mergeBase as beforeCommitId for line accuracy)
-          //
-          // IMPORTANT: All diff tools return ONLY git diff format. Use file_get without beforeCommitId for full content.
-          // This workflow ensures efficient, strategic analysis with proper context when needed.
-
-          // Repository Management Tools
-          {
-            name: "repos_list",
-            description:
-              "Lists all AWS CodeCommit repositories you have access to. Use this when: 1) User asks about repositories, 2) Need to find a specific repo details by name. Returns repository metadata including name, ID, description, default branch, creation date, and clone URLs. Supports search filtering and pagination for large lists. Essential first step for any repository operations.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                searchTerm: {
-                  type: "string",
-                  description:
-                    "Filter repositories by name or description (case-insensitive substring match). Use when user mentions a specific repo name or wants to find repos containing certain keywords.",
-                },
-                nextToken: {
-                  type: "string",
-                  description:
-                    "Pagination token from previous response. Only use when you need to fetch more results after receiving a nextToken in the response.",
-                },
-                maxResults: {
-                  type: "number",
-                  description:
-                    "Number of repositories to return (1-1000). Default 100. Use smaller values for quick overviews, larger for comprehensive lists.",
-                },
-              },
-            },
-          },
-          {
-            name: "repo_get",
-            description:
-              "Gets detailed information about a specific repository including metadata, default branch, clone URLs, creation date, and description. Use this when: 1) User asks about a specific repository, 2) Need repo details, 3) Want to show repo information. Provides complete repository context needed for code review and PR operations.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                repositoryName: {
-                  type: "string",
-                  description:
-                    "Exact name of the AWS CodeCommit repository. Must match exactly as shown in repository listings. Required for all repository-specific operations.",
-                },
-              },
-              required: ["repositoryName"],
-            },
-          },
-          {
-            name: "branches_list",
-            description:
-              "Lists all branches in a repository with their latest commit IDs. Use this when: 1) To see available branches, 2) User asks about branches, 3) Need to find source/target branches for PRs, 4) Checking branch structure. Essential for understanding repository branch topology and selecting correct branches for comparisons and PRs.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                repositoryName: {
-                  type: "string",
-                  description:
-                    "Repository name to list branches from. Must be exact repository name from repo listings.",
-                },
-                nextToken: {
-                  type: "string",
-                  description:
-                    "Pagination token for fetching additional branches if repository has many branches.",
-                },
-              },
-              required: ["repositoryName"],
-            },
-          },
-          {
-            name: "branch_get",
-            description:
-              "Gets detailed information about a specific branch including its latest commit ID and commit details. Use when: 1) Need specific branch information, 2) Want to see latest commit on a branch, 3) Validating branch exists before creating PRs. Provides branch head commit ID needed for PR operations and comparisons.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                repositoryName: {
-                  type: "string",
-                  description: "Repository containing the branch",
-                },
-                branchName: {
-                  type: "string",
-                  description:
-                    'Exact branch name (e.g., "main", "develop", "feature/new-feature"). Case-sensitive and must match exactly.',
-                },
-              },
-              required: ["repositoryName", "branchName"],
-            },
-          },
-          {
-            name: "file_get",
-            description:
-              "Retrieves file content with two distinct modes: 1) WITH beforeCommitId: Returns ONLY git diff format (no file content) - use for seeing what changed. 2) WITHOUT beforeCommitId: Returns full file content with line numbers - use when you need complete context beyond diff (understanding imports, class structure, function relationships, etc.). For code review: Start with diff tools, then use file_get WITHOUT beforeCommitId when diff alone doesn't provide enough context for proper analysis. Line numbers match AWS Console exactly.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                repositoryName: {
-                  type: "string",
-                  description: "Repository containing the file",
-                },
-                commitSpecifier: {
-                  type: "string",
-                  description:
-                    'Branch name (e.g., "main", "develop") or specific commit ID. Use branch names for latest version, commit IDs for specific versions.',
-                },
-                filePath: {
-                  type: "string",
-                  description:
-                    'Full path to file from repository root (e.g., "src/main.py", "docs/README.md"). Use forward slashes, no leading slash.',
-                },
-                beforeCommitId: {
-                  type: "string",
-                  description:
-                    "REQUIRED for modified files (M): Base commit ID to compare against (typically mergeBase from PR targets). When provided, response includes both numbered file content AND comprehensive diff analysis showing exactly which lines were added, removed, or modified. This is essential for understanding what changed in the files for accurate code review.",
-                },
-                includeLineNumbers: {
-                  type: "boolean",
-                  description:
-                    "Optional: Include line numbers in file content (default: true). Line numbers match AWS Console display exactly for accurate comment positioning.",
-                },
-                chunkOffset: {
-                  type: "number",
-                  description:
-                    "Optional: Starting line number for chunked response (1-based). Use with chunkLimit for large files. For diff chunking, this represents the hunk number.",
-                },
-                chunkLimit: {
-                  type: "number",
-                  description:
-                    "Optional: Maximum number of lines to return starting from chunkOffset. For diff chunking, this represents number of hunks to return. Use 500-1000 for optimal performance.",
-                },
-              },
-              required: ["repositoryName", "commitSpecifier", "filePath"],
-            },
-          },
-          {
-            name: "folder_get",
-            description:
-              "Lists all files and subdirectories in a folder at specific commit/branch. Essential for: 1) Exploring repository structure, 2) Finding files for review, 3) Understanding project organization, 4) Discovering relevant files for PRs. Returns list of files with paths, blob IDs, and file modes. Use to navigate repository structure before detailed file analysis.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                repositoryName: {
-                  type: "string",
-                  description: "Repository to explore",
-                },
-                commitSpecifier: {
-                  type: "string",
-                  description:
-                    "Branch name or commit ID to get folder contents from",
-                },
-                folderPath: {
-                  type: "string",
-                  description:
-                    'Path to folder from repository root (e.g., "src", "docs/api", ""). Use empty string for root directory.',
-                },
-              },
-              required: ["repositoryName", "commitSpecifier", "folderPath"],
-            },
-          },
-          {
-            name: "code_search",
-            description:
-              "Advanced code search and repository exploration tool. TWO MAIN MODES: 1) SEARCH MODE: Search for patterns within a specific file (REQUIRED: exact file path). Find functions, classes, imports, variables using regex or literal strings. Use when diff shows changes but you need to understand the broader context within that specific file. 2) TREE MODE: Display repository structure in formatted tree view to explore project organization and find files. Essential for understanding codebase structure when diff analysis lacks context.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                repositoryName: {
-                  type: "string",
-                  description: "Repository to search in",
-                },
-                commitSpecifier: {
-                  type: "string",
-                  description:
-                    "Branch name or commit ID to search at (e.g., 'main', 'develop', or specific commit ID)",
-                },
-                mode: {
-                  type: "string",
-                  enum: ["search", "tree"],
-                  description:
-                    "Operation mode: 'search' for code pattern searching, 'tree' for repository structure listing",
-                },
-                filePath: {
-                  type: "string",
-                  description:
-                    "Required for search mode. Exact file path to search within (e.g., 'src/main.js', 'components/Header.tsx')",
-                },
-                searchPatterns: {
-                  type: "array",
-                  description:
-                    "Required for search mode. Array of search patterns to find within the specified file",
-                  items: {
-                    type: "object",
-                    properties: {
-                      pattern: {
-                        type: "string",
-                        description:
-                          "Search pattern - regex (/pattern/flags), function name, class name, or literal string",
-                      },
-                      type: {
-                        type: "string",
-                        enum: [
-                          "regex",
-                          "literal",
-                          "function",
-                          "class",
-                          "import",
-                          "variable",
-                        ],
-                        description:
-                          "Search type: regex for complex patterns, literal for exact text, function/class for definitions, import for dependencies",
-                      },
-                      caseSensitive: {
-                        type: "boolean",
-                        description: "Case sensitive search (default: false)",
-                      },
-                    },
-                    required: ["pattern", "type"],
-                  },
-                },
-                treePath: {
-                  type: "string",
-                  description:
-                    "For tree mode: Root path to list (default: repository root). Use '/' for root or 'src/' for specific folder",
-                },
-                treeDepth: {
-                  type: "number",
-                  description:
-                    "For tree mode: Maximum depth to show (default: unlimited). Use 1 for top-level only, 2 for one level deep, etc.",
-                },
-                maxResults: {
-                  type: "number",
-                  description:
-                    "For search mode: Maximum results per pattern (default: 50, max: 200)",
-                },
-                includeContext: {
-                  type: "boolean",
-                  description:
-                    "For search mode: Include surrounding lines (default: true)",
-                },
-                contextLines: {
-                  type: "number",
-                  description:
-                    "For search mode: Context lines before/after match (default: 3, max: 10)",
-                },
-                excludePaths: {
-                  type: "array",
-                  items: { type: "string" },
-                  description:
-                    "Paths to exclude (e.g., ['node_modules', 'dist', '.git'])",
-                },
-              },
-              required: ["repositoryName", "commitSpecifier", "mode"],
-            },
-          },
-          {
-            name: "commit_get",
-            description:
-              "Gets comprehensive details about a specific commit including message, author, committer, timestamp, parent commits, and tree ID. Use when: 1) Analyzing commit in PR, 2) Understanding commit history, 3) Getting commit metadata for review, 4) Investigating specific changes. Provides full commit context needed for thorough code review.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                repositoryName: {
-                  type: "string",
-                  description: "Repository containing the commit",
-                },
-                commitId: {
-                  type: "string",
-                  description:
-                    "Full commit SHA ID (40-character hex string). Get from branch info, PR details, or git history.",
-                },
-              },
-              required: ["repositoryName", "commitId"],
-            },
-          },
-          {
-            name: "diff_get",
-            description:
-              "Gets high-level file differences between commits/branches showing which files changed (A/D/M) with paths and blob IDs. ESSENTIAL FIRST STEP for PR reviews. After this, use batch_diff_analyze to see what changed in multiple files (git diff only). If diffs don't provide enough context, use file_get without beforeCommitId for full file content, or code_search to find related patterns.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                repositoryName: {
-                  type: "string",
-                  description: "Repository to compare",
-                },
-                beforeCommitSpecifier: {
-                  type: "string",
-                  description:
-                    "Base commit/branch (what you're comparing FROM). For PR reviews, use mergeBase from PR targets, not destinationCommit.",
-                },
-                afterCommitSpecifier: {
-                  type: "string",
-                  description:
-                    "Compare commit/branch (what you're comparing TO). For PR reviews, use sourceCommit from PR targets.",
-                },
-                beforePath: {
-                  type: "string",
-                  description:
-                    "Optional: Filter differences to specific path in before commit. Use to focus on specific directories or files.",
-                },
-                afterPath: {
-                  type: "string",
-                  description:
-                    "Optional: Filter differences to specific path in after commit. Use to focus on specific directories or files.",
-                },
-                nextToken: {
-                  type: "string",
-                  description:
-                    "Pagination token for large changesets with many file differences.",
-                },
-              },
-              required: [
-                "repositoryName",
-                "beforeCommitSpecifier",
-                "afterCommitSpecifier",
-              ],
-            },
-          },
-          {
-            name: "file_diff_analyze",
-            description:
-              "Returns ONLY git diff format for a single file - no file content. Shows what changed with precise line numbers. For deleted files, returns deletion confirmation only. WHEN DIFF IS NOT ENOUGH: If you need more context beyond the diff (imports, function definitions, class structure), use file_get WITHOUT beforeCommitId to get full file content, or use code_search to find specific code patterns. For new files, consider using file_get to see full structure if diff alone doesn't provide enough context for review.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                repositoryName: {
-                  type: "string",
-                  description: "Repository containing the file",
-                },
-                beforeCommitId: {
-                  type: "string",
-                  description:
-                    "Commit ID to compare from (use mergeBase from PR for accurate line mapping)",
-                },
-                afterCommitId: {
-                  type: "string",
-                  description:
-                    "Commit ID to compare to (use sourceCommit from PR)",
-                },
-                filePath: {
-                  type: "string",
-                  description: "Path to the specific file to analyze",
-                },
-                changeType: {
-                  type: "string",
-                  enum: ["A", "D", "M"],
-                  description:
-                    "Change type from diff_get: A=Added, D=Deleted, M=Modified",
-                },
-              },
-              required: [
-                "repositoryName",
-                "beforeCommitId",
-                "afterCommitId",
-                "filePath",
-                "changeType",
-              ],
-            },
-          },
-          {
-            name: "batch_diff_analyze",
-            description:
-              "Returns ONLY git diff format for multiple files (3-5 max) - no file content. Shows what changed in each file. For deleted files, shows deletion status only. WHEN DIFFS ARE NOT ENOUGH: If any file's diff lacks context for proper review (missing imports, unclear function relationships, complex logic), use file_get without beforeCommitId for full content, or use code_search to find related code patterns across the repository. Provides strategic guidance on which files may need additional context.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                repositoryName: {
-                  type: "string",
-                  description: "Repository name",
-                },
-                beforeCommitId: {
-                  type: "string",
-                  description:
-                    "Base commit ID (use mergeBase from PR targets for accurate analysis)",
-                },
-                afterCommitId: {
-                  type: "string",
-                  description:
-                    "Compare commit ID (use sourceCommit from PR targets)",
-                },
-                fileDifferences: {
-                  type: "array",
-                  description:
-                    "Array of file differences from diff_get response",
-                  items: {
-                    type: "object",
-                    properties: {
-                      changeType: { type: "string", enum: ["A", "D", "M"] },
-                      beforeBlob: {
-                        type: "object",
-                        properties: {
-                          path: { type: "string" },
-                          blobId: { type: "string" },
-                        },
-                      },
-                      afterBlob: {
-                        type: "object",
-                        properties: {
-                          path: { type: "string" },
-                          blobId: { type: "string" },
-                        },
-                      },
-                    },
-                  },
-                },
-              },
-              required: [
-                "repositoryName",
-                "beforeCommitId",
-                "afterCommitId",
-                "fileDifferences",
-              ],
-            },
-          },
-
-          // Pull Request Management Tools
-          {
-            name: "prs_list",
-            description:
-              "Lists pull requests in a repository by status (OPEN/CLOSED). Use when: 1) Starting review session to see active PRs, 2) User asks about PRs, 3) Finding specific PR to review, 4) Getting overview of repository PR activity. Returns PR IDs that you must use with pr_get to get full details. Always follow with pr_get for each PR you need to analyze.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                repositoryName: {
-                  type: "string",
-                  description: "Repository to list PRs from",
-                },
-                pullRequestStatus: {
-                  type: "string",
-                  enum: ["OPEN", "CLOSED"],
-                  description:
-                    "OPEN for active PRs needing review, CLOSED for completed/abandoned PRs. Use OPEN by default for review workflow.",
-                },
-                nextToken: {
-                  type: "string",
-                  description:
-                    "Pagination token for repositories with many PRs",
-                },
-              },
-              required: ["repositoryName"],
-            },
-          },
-          {
-            name: "pr_get",
-            description:
-              "Gets complete PR details with critical commit IDs needed for accurate analysis. ESSENTIAL SECOND STEP after prs_list. Provides mergeBase (use for beforeCommitId in diff analysis) and sourceCommit/destinationCommit from targets array. Extract these commit IDs to use with diff_get → batch_diff_analyze → targeted file analysis workflow. The foundation for all subsequent PR analysis - provides the commit references that ensure accurate line mapping and change detection.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                pullRequestId: {
-                  type: "string",
-                  description:
-                    'PR ID from prs_list or user reference. Usually numeric string like "123" or "45".',
-                },
-              },
-              required: ["pullRequestId"],
-            },
-          },
-          {
-            name: "pr_create",
-            description:
-              "Creates a new pull request from source branch to destination branch. Use when: 1) User wants to create PR, 2) Proposing code changes, 3) Starting review process for branch changes. Requires clear title, description, and valid source/destination branches. Returns created PR details with ID for further operations.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                repositoryName: {
-                  type: "string",
-                  description: "Repository to create PR in",
-                },
-                title: {
-                  type: "string",
-                  description:
-                    'Clear, descriptive PR title summarizing the changes (e.g., "Add user authentication feature", "Fix memory leak in parser")',
-                },
-                description: {
-                  type: "string",
-                  description:
-                    "Detailed PR description explaining what changed, why, testing done, etc. Should provide context for reviewers.",
-                },
-                sourceReference: {
-                  type: "string",
-                  description:
-                    'Source branch name containing changes to merge (e.g., "feature/auth", "bugfix/parser"). Must exist and have commits ahead of target.',
-                },
-                destinationReference: {
-                  type: "string",
-                  description:
-                    'Target branch to merge into (e.g., "main", "develop"). Usually main development branch.',
-                },
-                clientRequestToken: {
-                  type: "string",
-                  description:
-                    "Optional unique token to prevent duplicate PR creation. Use UUID or timestamp if provided.",
-                },
-              },
-              required: [
-                "repositoryName",
-                "title",
-                "sourceReference",
-                "destinationReference",
-              ],
-            },
-          },
-          {
-            name: "pr_update_title",
-            description:
-              "Updates pull request title. Use when: 1) PR title needs correction, 2) Title doesn't reflect changes, 3) User requests title change. Automatically updates PR and returns updated PR details. Use clear, descriptive titles that summarize the changes.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                pullRequestId: {
-                  type: "string",
-                  description: "PR ID to update title for",
-                },
-                title: {
-                  type: "string",
-                  description:
-                    "New title that clearly describes the PR changes",
-                },
-              },
-              required: ["pullRequestId", "title"],
-            },
-          },
-          {
-            name: "pr_update_desc",
-            description:
-              "Updates pull request description. Use when: 1) PR description needs more detail, 2) Changes in scope/approach, 3) Adding context for reviewers. Provide comprehensive description explaining what changed, why, how to test, and any notes for reviewers.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                pullRequestId: {
-                  type: "string",
-                  description: "PR ID to update description for",
-                },
-                description: {
-                  type: "string",
-                  description:
-                    "New detailed description providing context, rationale, testing notes, and reviewer guidance",
-                },
-              },
-              required: ["pullRequestId", "description"],
-            },
-          },
-          {
-            name: "pr_close",
-            description:
-              "Closes a pull request without merging. Use when: 1) PR is abandoned/obsolete, 2) Changes no longer needed, 3) Superseded by another PR, 4) User requests closure. Permanently closes PR - cannot be merged after closing but can be reopened if needed.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                pullRequestId: {
-                  type: "string",
-                  description: "PR ID to close",
-                },
-              },
-              required: ["pullRequestId"],
-            },
-          },
-          {
-            name: "pr_reopen",
-            description:
-              "Reopens a previously closed pull request. Use when: 1) Closed PR needs to be active again, 2) Premature closure, 3) Reviving abandoned changes. Only works on closed PRs - cannot reopen merged PRs.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                pullRequestId: {
-                  type: "string",
-                  description: "Previously closed PR ID to reopen",
-                },
-              },
-              required: ["pullRequestId"],
-            },
-          },
-
-          // Comment and Review Tools
-          {
-            name: "comments_get",
-            description:
-              "Gets all comments on a pull request including general comments and line-specific comments. CRITICAL for PR review workflow. Use when: 1) Starting PR review to see existing feedback, 2) Understanding review conversation, 3) Checking if issues already raised. AWS API has conditional requirements: 1) Simple usage: Only provide pullRequestId to get ALL comments for the PR, 2) Filtered usage: Provide pullRequestId + repositoryName + beforeCommitId + afterCommitId together to filter comments by specific commit range.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                pullRequestId: {
-                  type: "string",
-                  description: "PR ID to get comments from",
-                },
-                repositoryName: {
-                  type: "string",
-                  description:
-                    "Optional: Repository containing the PR. When provided, BOTH beforeCommitId and afterCommitId must also be provided to filter comments by commit range.",
-                },
-                beforeCommitId: {
-                  type: "string",
-                  description:
-                    "Optional: Before commit ID to filter comments to specific commit range. REQUIRED if repositoryName is provided. Use destinationCommit from PR details (tip of destination branch when PR was created).",
-                },
-                afterCommitId: {
-                  type: "string",
-                  description:
-                    "Optional: After commit ID to filter comments to specific commit range. REQUIRED if repositoryName is provided. Use sourceCommit from PR details (tip of source branch when comment was made).",
-                },
-                nextToken: {
-                  type: "string",
-                  description: "Pagination for PRs with many comments",
-                },
-              },
-              required: ["pullRequestId"],
-            },
-          },
-          {
-            name: "comment_post",
-            description:
-              "Posts a comment on pull request - either general PR comment or line-specific code comment. Use when: 1) Providing PR feedback, 2) Asking questions about changes, 3) Suggesting improvements, 4) Highlighting specific code issues. Can post on specific lines by providing filePath and filePosition for targeted feedback.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                pullRequestId: {
-                  type: "string",
-                  description: "PR ID to comment on",
-                },
-                repositoryName: {
-                  type: "string",
-                  description: "Repository containing the PR",
-                },
-                beforeCommitId: {
-                  type: "string",
-                  description:
-                    "Before commit ID from PR details. For line-specific comments, use mergeBase from PR targets. For general comments, use destinationCommit. Required for all comments.",
-                },
-                afterCommitId: {
-                  type: "string",
-                  description:
-                    "After commit ID from PR details. Use sourceCommit from PR targets. Required for all comments.",
-                },
-                content: {
-                  type: "string",
-                  description:
-                    "Comment text. Be specific, constructive, and helpful. For line comments, reference the specific code issue.",
-                },
-                filePath: {
-                  type: "string",
-                  description:
-                    'Optional: File path for line-specific comment (e.g., "src/main.py"). Omit for general PR comment. When provided, filePosition and relativeFileVersion must also be provided.',
-                },
-                filePosition: {
-                  type: "number",
-                  description:
-                    "Optional: Line number for line-specific comment. REQUIRED if filePath is provided. Use with filePath for precise code feedback.",
-                },
-                relativeFileVersion: {
-                  type: "string",
-                  enum: ["BEFORE", "AFTER"],
-                  description:
-                    "Optional: BEFORE for original file version, AFTER for changed file version. REQUIRED if filePath is provided. Use AFTER for comments on new code.",
-                },
-                clientRequestToken: {
-                  type: "string",
-                  description:
-                    "Optional: Unique token to prevent duplicate comments",
-                },
-              },
-              required: [
-                "pullRequestId",
-                "repositoryName",
-                "beforeCommitId",
-                "afterCommitId",
-                "content",
-              ],
-            },
-          },
-          {
-            name: "comment_update",
-            description:
-              "Updates existing comment content. Use when: 1) Comment needs correction, 2) Adding more information, 3) Clarifying feedback. Can edit your own comments to improve clarity or add details after further analysis.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                commentId: {
-                  type: "string",
-                  description: "Comment ID from comments_get response",
-                },
-                content: {
-                  type: "string",
-                  description:
-                    "Updated comment content with corrections or additional information",
-                },
-              },
-              required: ["commentId", "content"],
-            },
-          },
-          {
-            name: "comment_delete",
-            description:
-              "Deletes a comment (marks as deleted, preserves comment thread structure). Use when: 1) Comment is incorrect/inappropriate, 2) No longer relevant, 3) Duplicate feedback. Use sparingly - editing is usually better than deleting.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                commentId: {
-                  type: "string",
-                  description: "Comment ID to delete",
-                },
-              },
-              required: ["commentId"],
-            },
-          },
-          {
-            name: "comment_reply",
-            description:
-              "Replies to an existing comment, creating a threaded conversation. Use when: 1) Responding to questions, 2) Continuing discussion, 3) Addressing feedback, 4) Clarifying points. Maintains comment thread context for organized discussions.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                pullRequestId: {
-                  type: "string",
-                  description: "PR containing the original comment",
-                },
-                repositoryName: {
-                  type: "string",
-                  description: "Repository containing the PR",
-                },
-                beforeCommitId: {
-                  type: "string",
-                  description:
-                    "Before commit ID from PR details. Use mergeBase from PR targets.",
-                },
-                afterCommitId: {
-                  type: "string",
-                  description:
-                    "After commit ID from PR details. Use sourceCommit from PR targets.",
-                },
-                inReplyTo: {
-                  type: "string",
-                  description:
-                    "Comment ID you're replying to (from comments_get)",
-                },
-                content: {
-                  type: "string",
-                  description: "Reply content addressing the original comment",
-                },
-                clientRequestToken: {
-                  type: "string",
-                  description: "Optional: Unique token for reply",
-                },
-              },
-              required: [
-                "pullRequestId",
-                "repositoryName",
-                "beforeCommitId",
-                "afterCommitId",
-                "inReplyTo",
-                "content",
-              ],
-            },
-          },
+      }
+    );
 
-          // Approval and Review State Tools
-          {
-            name: "approvals_get",
-            description:
-              "Gets current approval states for a pull request showing who approved/revoked and current status. Use when: 1) Checking if PR ready to merge, 2) Understanding approval status, 3) Seeing who reviewed. Critical for merge decisions and understanding PR approval workflow.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                pullRequestId: {
-                  type: "string",
-                  description: "PR ID to check approvals for",
-                },
-                revisionId: {
-                  type: "string",
-                  description:
-                    "PR revision ID from pr_get response. Approvals are tied to specific revisions.",
-                },
-              },
-              required: ["pullRequestId", "revisionId"],
-            },
-          },
-          {
-            name: "approval_set",
-            description:
-              "Approve or revoke approval for a pull request. Use when: 1) PR looks good and ready to merge (APPROVE), 2) Found issues and withdrawing approval (REVOKE), 3) Completing code review process. Your approval/revoke affects whether PR can be merged based on approval rules.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                pullRequestId: {
-                  type: "string",
-                  description: "PR ID to approve or revoke",
-                },
-                revisionId: {
-                  type: "string",
-                  description: "PR revision ID from pr_get response",
-                },
-                approvalStatus: {
-                  type: "string",
-                  enum: ["APPROVE", "REVOKE"],
-                  description:
-                    "APPROVE if code review passed and PR ready to merge, REVOKE if issues found or approval withdrawn",
-                },
-              },
-              required: ["pullRequestId", "revisionId", "approvalStatus"],
-            },
-          },
-          {
-            name: "approval_rules_check",
-            description:
-              "Evaluates if pull request meets all approval rules (required approvers, approval counts, etc.). Use when: 1) Checking if PR can be merged, 2) Understanding why PR blocked, 3) Validating approval requirements. Shows which rules are satisfied and which need attention.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                pullRequestId: {
-                  type: "string",
-                  description: "PR ID to evaluate approval rules for",
-                },
-                revisionId: {
-                  type: "string",
-                  description: "PR revision ID from pr_get response",
-                },
-              },
-              required: ["pullRequestId", "revisionId"],
-            },
-          },
+    const config: MCPConfig = {
+      awsProfile: process.env.AWS_PROFILE,
+      awsAccessKeyId: process.env.AWS_ACCESS_KEY_ID,
+      awsSecretAccessKey: process.env.AWS_SECRET_ACCESS_KEY,
+      awsSessionToken: process.env.AWS_SESSION_TOKEN,
+      region: process.env.AWS_REGION || "us-east-1",
+    };
 
-          // Merge Management Tools
-          {
-            name: "merge_conflicts_check",
-            description:
-              "Checks for merge conflicts between source and destination branches before attempting merge. Use when: 1) Before merging PR, 2) Understanding why merge failed, 3) Planning conflict resolution. Shows if merge is clean or has conflicts requiring resolution.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                repositoryName: {
-                  type: "string",
-                  description: "Repository containing the branches",
-                },
-                destinationCommitSpecifier: {
-                  type: "string",
-                  description:
-                    'Target branch or commit (e.g., "main", "develop") that changes will merge into',
-                },
-                sourceCommitSpecifier: {
-                  type: "string",
-                  description:
-                    "Source branch or commit containing changes to merge",
-                },
-                mergeOption: {
-                  type: "string",
-                  enum: [
-                    "FAST_FORWARD_MERGE",
-                    "SQUASH_MERGE",
-                    "THREE_WAY_MERGE",
-                  ],
-                  description:
-                    "Merge strategy: FAST_FORWARD_MERGE (linear), SQUASH_MERGE (single commit), THREE_WAY_MERGE (preserve history)",
-                },
-              },
-              required: [
-                "repositoryName",
-                "destinationCommitSpecifier",
-                "sourceCommitSpecifier",
-                "mergeOption",
-              ],
-            },
-          },
-          {
-            name: "merge_options_get",
-            description:
-              "Gets available merge strategies for a pull request based on branch relationship and repository settings. Use when: 1) Planning PR merge, 2) Understanding merge options, 3) Before attempting merge. Shows which merge types (fast-forward, squash, three-way) are available.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                repositoryName: {
-                  type: "string",
-                  description: "Repository containing the PR",
-                },
-                sourceCommitSpecifier: {
-                  type: "string",
-                  description: "Source branch/commit from PR details",
-                },
-                destinationCommitSpecifier: {
-                  type: "string",
-                  description: "Destination branch/commit from PR details",
-                },
-              },
-              required: [
-                "repositoryName",
-                "sourceCommitSpecifier",
-                "destinationCommitSpecifier",
-              ],
-            },
-          },
-          {
-            name: "pr_merge",
-            description:
-              "Merges an approved pull request using specified merge strategy. Use when: 1) PR approved and ready to merge, 2) No conflicts exist, 3) All approval rules satisfied. IMPORTANT: This permanently merges changes into target branch. Verify approval status first.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                pullRequestId: {
-                  type: "string",
-                  description: "Approved PR ID to merge",
-                },
-                repositoryName: {
-                  type: "string",
-                  description: "Repository containing the PR",
-                },
-                mergeOption: {
-                  type: "string",
-                  enum: [
-                    "FAST_FORWARD_MERGE",
-                    "SQUASH_MERGE",
-                    "THREE_WAY_MERGE",
-                  ],
-                  description:
-                    "FAST_FORWARD_MERGE: linear history, SQUASH_MERGE: single commit, THREE_WAY_MERGE: preserve branch history",
-                },
-                commitMessage: {
-                  type: "string",
-                  description:
-                    "Optional: Custom merge commit message. Use for SQUASH_MERGE and THREE_WAY_MERGE to describe the merge.",
-                },
-                authorName: {
-                  type: "string",
-                  description: "Optional: Author name for merge commit",
-                },
-                email: {
-                  type: "string",
-                  description: "Optional: Author email for merge commit",
-                },
-              },
-              required: ["pullRequestId", "repositoryName", "mergeOption"],
-            },
-          },
+    this.authManager = new AWSAuthManager(config);
+    this.repositoryService = new RepositoryService(this.authManager);
+    this.pullRequestService = new PullRequestService(
+      this.authManager,
+      this.repositoryService
+    );
+    this.diffAnalyzer = new IntelligentDiffAnalyzer(this.repositoryService);
 
-          // AWS Credential Management Tools
-          {
-            name: "aws_creds_refresh",
-            description:
-              "Manually refreshes AWS credentials (normally auto-refreshed every 7.5 hours). Use when: 1) Credentials expired, 2) Getting authentication errors, 3) Switched AWS configuration, 4) Testing credential validity. Reloads from configured source (profile/environment).",
-            inputSchema: {
-              type: "object",
-              properties: {},
-            },
-          },
-          {
-            name: "aws_profile_switch",
-            description:
-              "Switches to different AWS profile for accessing different AWS accounts/roles. Use when: 1) Need to access different AWS account, 2) Switch between environments (dev/prod), 3) Use different IAM roles. Automatically refreshes credentials for new profile.",
-            inputSchema: {
-              type: "object",
-              properties: {
-                profileName: {
-                  type: "string",
-                  description:
-                    'AWS profile name from ~/.aws/credentials or ~/.aws/config (e.g., "default", "production", "dev")',
-                },
-              },
-              required: ["profileName"],
-            },
-          },
-          {
-            name: "aws_profiles_list",
-            description:
-              "Lists all available AWS profiles configured in ~/.aws/credentials. Use when: 1) User wants to switch profiles, 2) Checking available AWS accounts, 3) Troubleshooting authentication. Shows profile names that can be used with aws_profile_switch.",
-            inputSchema: {
-              type: "object",
-              properties: {},
-            },
-          },
-          {
-            name: "aws_creds_status",
-            description:
-              "Shows current AWS credentials status including validity, expiration time, and access key info. Use when: 1) Troubleshooting authentication issues, 2) Checking if credentials expired, 3) Verifying correct AWS account. Helps diagnose credential-related problems.",
-            inputSchema: {
-              type: "object",
-              properties: {},
-            },
-          },
-        ] as Tool[],
-      };
+    this.setupToolHandlers();
+  }
+
+  private setupToolHandlers() {
+    this.server.setRequestHandler(ListToolsRequestSchema, async () => {
+      return { tools: TOOLS };
     });
 
     this.server.setRequestHandler(CallToolRequestSchema, async (request) => {
@@ -1066,20 +1136,12 @@ class AWSPRReviewerServer {
                   args.searchTerm as string,
                   paginationOptions
                 );
-                return {
-                  content: [
-                    { type: "text", text: JSON.stringify(result, null, 2) },
-                  ],
-                };
+                return jsonResult(result);
               } else {
                 const result = await this.repositoryService.listRepositories(
                   paginationOptions
                 );
-                return {
-                  content: [
-                    { type: "text", text: JSON.stringify(result, null, 2) },
-                  ],
-                };
+                return jsonResult(result);
               }
             });
 
@@ -1088,11 +1150,7 @@ class AWSPRReviewerServer {
               const result = await this.repositoryService.getRepository(
                 args.repositoryName as string
               );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           case "branches_list":
@@ -1105,11 +1163,7 @@ class AWSPRReviewerServer {
                 args.repositoryName as string,
                 paginationOptions
               );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           case "branch_get":
@@ -1118,36 +1172,92 @@ class AWSPRReviewerServer {
                 args.repositoryName as string,
                 args.branchName as string
               );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           case "file_get":
             return await retryWithBackoff(async () => {
+              // With beforeCommitId, ask GetDifferences how the file changed before downloading
+              // anything; unchanged files are answered without transferring content
+              let changeType: "A" | "D" | "M" = "M";
+              if (args.beforeCommitId) {
+                const resolved = await this.diffAnalyzer
+                  .resolveChangeType(
+                    args.repositoryName as string,
+                    args.beforeCommitId as string,
+                    args.commitSpecifier as string,
+                    args.filePath as string
+                  )
+                  .catch((error) => {
+                    console.error("GetDifferences lookup failed:", error);
+                    return "M" as const;
+                  });
+
+                if (resolved === null) {
+                  const result = {
+                    filePath: args.filePath,
+                    status: "FILE_UNCHANGED",
+                    message: `File '${args.filePath}' is identical in both commits. No diff to show.`,
+                    analysisType: "diff_only",
+                  };
+                  return jsonResult(result);
+                }
+
+                // The file is gone from commitSpecifier, so there is no after side to fetch
+                if (resolved === "D") {
+                  const result = {
+                    filePath: args.filePath,
+                    changeType: "D",
+                    status: CHANGE_STATUS.D,
+                    message: `File '${args.filePath}' was deleted. No diff content to show; use file_get with the beforeCommitId as commitSpecifier to read the removed content.`,
+                    analysisType: "diff_only",
+                  };
+                  return jsonResult(result);
+                }
+                changeType = resolved;
+              }
+
               const fileResult = await this.repositoryService.getFile(
                 args.repositoryName as string,
                 args.commitSpecifier as string,
                 args.filePath as string
               );
 
+              if (fileResult.isBinary) {
+                const result = {
+                  filePath: args.filePath,
+                  blobId: fileResult.blobId,
+                  fileSize: fileResult.size,
+                  status: "BINARY_FILE",
+                  message:
+                    "File appears to be binary. Content and line-level diffs are not available.",
+                };
+                return jsonResult(result);
+              }
+
               const MAX_FILE_SIZE = 50000; // 50KB character limit
               const MAX_DIFF_SIZE = 100000; // 100KB diff limit
+              const MAX_DIFFABLE_FILE_SIZE = 5000000; // 5MB: don't fetch the other side or diff beyond this
               const fileSize = fileResult.content.length;
+              const diffSkipped =
+                !!args.beforeCommitId && fileSize > MAX_DIFFABLE_FILE_SIZE;
 
               console.error(`File ${args.filePath}: ${fileSize} characters`);
+              if (diffSkipped) {
+                console.error(
+                  `Skipping diff for ${args.filePath}: exceeds ${MAX_DIFFABLE_FILE_SIZE} characters`
+                );
+              }
 
               // If beforeCommitId is provided, always prioritize diff analysis
-              if (args.beforeCommitId) {
+              if (args.beforeCommitId && !diffSkipped) {
                 try {
                   const diffAnalysis = await this.diffAnalyzer.analyzeFileDiff(
                     args.repositoryName as string,
                     args.beforeCommitId as string,
                     args.commitSpecifier as string,
                     args.filePath as string,
-                    "M" // Assume modified for diff analysis
+                    changeType
                   );
 
                   const gitDiffSize = diffAnalysis.gitDiffFormat.length;
@@ -1185,18 +1295,11 @@ class AWSPRReviewerServer {
                           diffSummary: diffAnalysis.summary,
                           lineNumberMapping: diffAnalysis.lineNumberMapping,
                         };
-                        return {
-                          content: [
-                            {
-                              type: "text",
-                              text: JSON.stringify(result, null, 2),
-                            },
-                          ],
-                        };
+                        return jsonResult(result);
                       } else {
                         // Even diff is too large, provide chunking info
-                        const totalHunks = (
-                          diffAnalysis.gitDiffFormat.match(/@@/g) || []
+                        const totalHunks = this.findHunkStarts(
+                          diffAnalysis.gitDiffFormat
                         ).length;
                         const result = {
                           filePath: args.filePath,
@@ -1205,26 +1308,12 @@ class AWSPRReviewerServer {
                           status: "DIFF_TOO_LARGE_FOR_SINGLE_RESPONSE",
                           message:
                             "File and diff are both too large. Use chunkOffset and chunkLimit parameters to fetch in chunks.",
-                          totalLines: fileResult.content.split("\n").length,
+                          totalLines: getLineStarts(fileResult).length,
                           totalHunks,
                           diffSummary: diffAnalysis.summary,
-                          chunkingInstructions: {
-                            useParameters:
-                              "chunkOffset (starting hunk number, 1-based) and chunkLimit (number of hunks)",
-                            example:
-                              "chunkOffset: 1, chunkLimit: 5 for first 5 hunks",
-                            recommendedChunkSize:
-                              "3-5 hunks per request for optimal performance",
-                          },
-                        };
-                        return {
-                          content: [
-                            {
-                              type: "text",
-                              text: JSON.stringify(result, null, 2),
-                            },
-                          ],
+                          chunkingInstructions: DIFF_CHUNKING_INSTRUCTIONS,
                         };
+                        return jsonResult(result);
                       }
                     } else {
                       // Return diff only
@@ -1235,7 +1324,7 @@ class AWSPRReviewerServer {
                         message:
                           "File is too large (>50KB). Returning git diff format only to show what changed.",
                         gitDiffFormat: diffAnalysis.gitDiffFormat,
-                        totalLines: fileResult.content.split("\n").length,
+                        totalLines: getLineStarts(fileResult).length,
                         diffSummary: diffAnalysis.summary,
                         modificationSummary: {
                           linesAdded: diffAnalysis.summary.linesAdded,
@@ -1243,26 +1332,11 @@ class AWSPRReviewerServer {
                           totalChanges: diffAnalysis.summary.totalChanges,
                           complexity:
                             diffAnalysis.analysisRecommendation.complexity,
-                          changeType:
-                            "Modified (M) - git diff format only due to file size",
-                        },
-                        contextGuidance: {
-                          suggestion:
-                            "File too large for full content. Use code_search to find specific patterns in this file.",
-                          alternatives: [
-                            "Use code_search in 'search' mode with this file path to find specific functions/classes",
-                            "Use code_search in 'tree' mode to explore related smaller files",
-                          ],
+                          changeType: `${CHANGE_LABELS[changeType]} - git diff format only due to file size`,
                         },
+                        contextGuidance: LARGE_FILE_DIFF_GUIDANCE,
                       };
-                      return {
-                        content: [
-                          {
-                            type: "text",
-                            text: JSON.stringify(result, null, 2),
-                          },
-                        ],
-                      };
+                      return jsonResult(result);
                     }
                   } else {
                     // Return only diff format, no file content
@@ -1272,7 +1346,7 @@ class AWSPRReviewerServer {
                       status: "DIFF_ONLY_RESPONSE",
                       message:
                         "Returning git diff format only (beforeCommitId provided). For full file content, use file_get without beforeCommitId.",
-                      totalLines: fileResult.content.split("\n").length,
+                      totalLines: getLineStarts(fileResult).length,
                       analysisType: "diff_only",
                       diffSummary: diffAnalysis.summary,
                       modificationSummary: {
@@ -1281,26 +1355,15 @@ class AWSPRReviewerServer {
                         totalChanges: diffAnalysis.summary.totalChanges,
                         complexity:
                           diffAnalysis.analysisRecommendation.complexity,
-                        changeType: "Modified (M) - git diff format only",
-                      },
-                      contextGuidance: {
-                        suggestion:
-                          "If diff doesn't provide enough context, use file_get without beforeCommitId for full content",
-                        alternatives: [
-                          "Use code_search in 'search' mode to find specific patterns in this file",
-                          "Use code_search in 'tree' mode to explore related files",
-                        ],
+                        changeType: `${CHANGE_LABELS[changeType]} - git diff format only`,
                       },
+                      contextGuidance: DIFF_ONLY_GUIDANCE,
                     };
 
                     console.error(
                       `File analysis completed for ${args.filePath}: ${diffAnalysis.summary.totalChanges} total changes`
                     );
-                    return {
-                      content: [
-                        { type: "text", text: JSON.stringify(result, null, 2) },
-                      ],
-                    };
+                    return jsonResult(result);
                   }
                 } catch (error) {
                   console.error("Failed to generate diff analysis:", error);
@@ -1315,84 +1378,68 @@ class AWSPRReviewerServer {
                   args.chunkOffset !== undefined &&
                   args.chunkLimit !== undefined
                 ) {
-                  const lines = fileResult.content.split("\n");
+                  const totalLines = getLineStarts(fileResult).length;
                   const startLine = Math.max(1, args.chunkOffset as number);
                   const endLine = Math.min(
-                    lines.length,
+                    totalLines,
                     startLine + (args.chunkLimit as number) - 1
                   );
 
-                  const chunkLines = lines.slice(startLine - 1, endLine);
-                  const contentWithLineNumbers = chunkLines
-                    .map(
-                      (line, index) =>
-                        `${(startLine + index)
-                          .toString()
-                          .padStart(4, " ")}→${line}`
-                    )
-                    .join("\n");
+                  const chunkLines = sliceFileLines(
+                    fileResult,
+                    startLine,
+                    endLine
+                  );
+                  const truncatedLines = clampLongLines(chunkLines);
+                  const contentWithLineNumbers = formatWithLineNumbers(
+                    chunkLines,
+                    startLine
+                  );
 
                   const result = {
                     filePath: args.filePath,
                     fileSize,
                     status: "CHUNKED_CONTENT_RESPONSE",
-                    message: `Returning lines ${startLine}-${endLine} of ${lines.length} total lines.`,
+                    message: `Returning lines ${startLine}-${endLine} of ${totalLines} total lines.`,
                     contentWithLineNumbers,
                     chunkInfo: {
                       chunkOffset: startLine,
                       chunkLimit: args.chunkLimit,
-                      totalLines: lines.length,
+                      totalLines,
                       startLine,
                       endLine,
-                      hasMore: endLine < lines.length,
+                      hasMore: endLine < totalLines,
                       nextChunkOffset:
-                        endLine < lines.length ? endLine + 1 : undefined,
+                        endLine < totalLines ? endLine + 1 : undefined,
+                      truncatedLines: truncatedLines || undefined,
                     },
                     lineNumberFormat:
                       "AWS Console compatible (1-based indexing)",
                     analysisType: "file_content_chunk",
                   };
-                  return {
-                    content: [
-                      { type: "text", text: JSON.stringify(result, null, 2) },
-                    ],
-                  };
+                  return jsonResult(result);
                 } else {
-                  const totalLines = fileResult.content.split("\n").length;
+                  const totalLines = getLineStarts(fileResult).length;
                   const result = {
                     filePath: args.filePath,
                     fileSize,
                     status: "FILE_TOO_LARGE",
-                    message:
-                      "File is too large (>50KB). For modified files, provide beforeCommitId to get git diff. For new files, use chunking.",
+                    message: diffSkipped
+                      ? "File is too large (>5MB) to diff. Use chunking to read its content."
+                      : "File is too large (>50KB). For modified files, provide beforeCommitId to get git diff. For new files, use chunking.",
                     totalLines,
-                    recommendation:
-                      "Use beforeCommitId parameter to get git diff format, or use chunkOffset/chunkLimit for content chunking",
-                    chunkingInstructions: {
-                      useParameters:
-                        "chunkOffset (starting line number, 1-based) and chunkLimit (number of lines)",
-                      example:
-                        "chunkOffset: 1, chunkLimit: 500 for first 500 lines",
-                      recommendedChunkSize:
-                        "500-1000 lines per request for optimal performance",
-                    },
-                  };
-                  return {
-                    content: [
-                      { type: "text", text: JSON.stringify(result, null, 2) },
-                    ],
+                    recommendation: diffSkipped
+                      ? "Use chunkOffset/chunkLimit to read the file in chunks; no diff is available at this size"
+                      : "Use beforeCommitId parameter to get git diff format, or use chunkOffset/chunkLimit for content chunking",
+                    chunkingInstructions: CONTENT_CHUNKING_INSTRUCTIONS,
                   };
+                  return jsonResult(result);
                 }
               }
 
               // File is small enough, return content with line numbers
               const lines = fileResult.content.split("\n");
-              const contentWithLineNumbers = lines
-                .map(
-                  (line, index) =>
-                    `${(index + 1).toString().padStart(4, " ")}→${line}`
-                )
-                .join("\n");
+              const contentWithLineNumbers = formatWithLineNumbers(lines);
 
               const result = {
                 filePath: args.filePath,
@@ -1405,11 +1452,7 @@ class AWSPRReviewerServer {
                   "If this is a modified file (M), provide beforeCommitId to see git diff of what changed",
               };
 
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           case "folder_get":
@@ -1419,11 +1462,7 @@ class AWSPRReviewerServer {
                 args.commitSpecifier as string,
                 args.folderPath as string
               );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           case "code_search":
@@ -1439,11 +1478,7 @@ class AWSPRReviewerServer {
                   args.treeDepth as number
                 );
 
-                return {
-                  content: [
-                    { type: "text", text: JSON.stringify(result, null, 2) },
-                  ],
-                };
+                return jsonResult(result);
               } else {
                 // Search mode - find code patterns in specific file
                 const filePath = args.filePath as string;
@@ -1471,11 +1506,7 @@ class AWSPRReviewerServer {
                   }
                 );
 
-                return {
-                  content: [
-                    { type: "text", text: JSON.stringify(result, null, 2) },
-                  ],
-                };
+                return jsonResult(result);
               }
             });
 
@@ -1485,11 +1516,7 @@ class AWSPRReviewerServer {
                 args.repositoryName as string,
                 args.commitId as string
               );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           case "diff_get":
@@ -1506,11 +1533,7 @@ class AWSPRReviewerServer {
                 args.afterPath as string,
                 paginationOptions
               );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           case "file_diff_analyze":
@@ -1538,11 +1561,7 @@ class AWSPRReviewerServer {
                   },
                 };
 
-                return {
-                  content: [
-                    { type: "text", text: JSON.stringify(result, null, 2) },
-                  ],
-                };
+                return jsonResult(result);
               }
 
               // For new (A) and modified (M) files, get diff analysis
@@ -1575,14 +1594,7 @@ class AWSPRReviewerServer {
                 console.error(
                   `Diff too large for ${args.filePath}: ${gitDiffSize} characters`
                 );
-                return {
-                  content: [
-                    {
-                      type: "text",
-                      text: JSON.stringify(chunkedResult, null, 2),
-                    },
-                  ],
-                };
+                return jsonResult(chunkedResult);
               }
 
               // Return only diff format, no file content
@@ -1590,7 +1602,7 @@ class AWSPRReviewerServer {
                 filePath: result.filePath,
                 changeType: result.changeType,
                 gitDiffFormat: result.gitDiffFormat,
-                status: changeType === "A" ? "FILE_ADDED" : "FILE_MODIFIED",
+                status: CHANGE_STATUS[changeType],
                 message:
                   changeType === "A"
                     ? `New file '${args.filePath}' added - showing diff format`
@@ -1602,14 +1614,7 @@ class AWSPRReviewerServer {
               console.error(
                 `Diff analysis for ${args.filePath}: ${gitDiffSize} characters, ${result.summary.totalChanges} changes`
               );
-              return {
-                content: [
-                  {
-                    type: "text",
-                    text: JSON.stringify(diffOnlyResult, null, 2),
-                  },
-                ],
-              };
+              return jsonResult(diffOnlyResult);
             });
 
           case "batch_diff_analyze":
@@ -1632,11 +1637,7 @@ class AWSPRReviewerServer {
                     .slice(5)
                     .map((f) => f.afterBlob?.path || f.beforeBlob?.path),
                 };
-                return {
-                  content: [
-                    { type: "text", text: JSON.stringify(result, null, 2) },
-                  ],
-                };
+                return jsonResult(result);
               }
 
               const result = await this.diffAnalyzer.analyzeBatchDiffs(
@@ -1670,10 +1671,7 @@ class AWSPRReviewerServer {
                     filePath: analysis.filePath,
                     changeType: analysis.changeType,
                     gitDiffFormat: analysis.gitDiffFormat,
-                    status:
-                      analysis.changeType === "A"
-                        ? "FILE_ADDED"
-                        : "FILE_MODIFIED",
+                    status: CHANGE_STATUS[analysis.changeType],
                     message:
                       analysis.changeType === "A"
                         ? `New file '${analysis.filePath}' added`
@@ -1699,12 +1697,7 @@ class AWSPRReviewerServer {
                   files: result.analyses.map((analysis) => ({
                     filePath: analysis.filePath,
                     changeType: analysis.changeType,
-                    status:
-                      analysis.changeType === "D"
-                        ? "FILE_DELETED"
-                        : analysis.changeType === "A"
-                        ? "FILE_ADDED"
-                        : "FILE_MODIFIED",
+                    status: CHANGE_STATUS[analysis.changeType],
                     gitDiffSize:
                       analysis.changeType === "D"
                         ? 0
@@ -1719,27 +1712,13 @@ class AWSPRReviewerServer {
                     "Use file_diff_analyze for individual files to get git diff format",
                 };
 
-                return {
-                  content: [
-                    {
-                      type: "text",
-                      text: JSON.stringify(compactResult, null, 2),
-                    },
-                  ],
-                };
+                return jsonResult(compactResult);
               }
 
               console.error(
                 `Batch analysis complete: ${fileDifferences.length} files, ${responseSize} characters`
               );
-              return {
-                content: [
-                  {
-                    type: "text",
-                    text: JSON.stringify(diffOnlyResult, null, 2),
-                  },
-                ],
-              };
+              return jsonResult(diffOnlyResult);
             });
 
           // Pull Request Management Tools
@@ -1754,11 +1733,7 @@ class AWSPRReviewerServer {
                 (args.pullRequestStatus as "OPEN" | "CLOSED") || "OPEN",
                 paginationOptions
               );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           case "pr_get":
@@ -1766,11 +1741,7 @@ class AWSPRReviewerServer {
               const result = await this.pullRequestService.getPullRequest(
                 args.pullRequestId as string
               );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           case "pr_create":
@@ -1783,11 +1754,7 @@ class AWSPRReviewerServer {
                 args.destinationReference as string,
                 args.clientRequestToken as string
               );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           case "pr_update_title":
@@ -1797,11 +1764,7 @@ class AWSPRReviewerServer {
                   args.pullRequestId as string,
                   args.title as string
                 );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           case "pr_update_desc":
@@ -1811,11 +1774,7 @@ class AWSPRReviewerServer {
                   args.pullRequestId as string,
                   args.description as string
                 );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           case "pr_close":
@@ -1823,11 +1782,7 @@ class AWSPRReviewerServer {
               const result = await this.pullRequestService.closePullRequest(
                 args.pullRequestId as string
               );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           case "pr_reopen":
@@ -1835,11 +1790,7 @@ class AWSPRReviewerServer {
               const result = await this.pullRequestService.reopenPullRequest(
                 args.pullRequestId as string
               );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           // Comment and Review Tools
@@ -1856,11 +1807,7 @@ class AWSPRReviewerServer {
                 args.afterCommitId as string,
                 paginationOptions
               );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           case "comment_post":
@@ -1884,11 +1831,7 @@ class AWSPRReviewerServer {
                 location,
                 args.clientRequestToken as string
               );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           case "comment_update":
@@ -1897,11 +1840,7 @@ class AWSPRReviewerServer {
                 args.commentId as string,
                 args.content as string
               );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           case "comment_delete":
@@ -1909,11 +1848,7 @@ class AWSPRReviewerServer {
               const result = await this.pullRequestService.deleteComment(
                 args.commentId as string
               );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           case "comment_reply":
@@ -1927,11 +1862,7 @@ class AWSPRReviewerServer {
                 args.content as string,
                 args.clientRequestToken as string
               );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           // Approval and Review State Tools
@@ -1941,11 +1872,7 @@ class AWSPRReviewerServer {
                 args.pullRequestId as string,
                 args.revisionId as string
               );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           case "approval_set":
@@ -1972,11 +1899,7 @@ class AWSPRReviewerServer {
                   args.pullRequestId as string,
                   args.revisionId as string
                 );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           // Merge Management Tools
@@ -1991,11 +1914,7 @@ class AWSPRReviewerServer {
                   | "SQUASH_MERGE"
                   | "THREE_WAY_MERGE"
               );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           case "merge_options_get":
@@ -2005,11 +1924,7 @@ class AWSPRReviewerServer {
                 args.sourceCommitSpecifier as string,
                 args.destinationCommitSpecifier as string
               );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           case "pr_merge":
@@ -2025,11 +1940,7 @@ class AWSPRReviewerServer {
                 args.authorName as string,
                 args.email as string
               );
-              return {
-                content: [
-                  { type: "text", text: JSON.stringify(result, null, 2) },
-                ],
-              };
+              return jsonResult(result);
             });
 
           // AWS Credential Management Tools
@@ -2068,11 +1979,7 @@ class AWSPRReviewerServer {
 
           case "aws_profiles_list": {
             const profiles = this.authManager.getAvailableProfiles();
-            return {
-              content: [
-                { type: "text", text: JSON.stringify(profiles, null, 2) },
-              ],
-            };
+            return jsonResult(profiles);
           }
 
           case "aws_creds_status": {
@@ -2088,11 +1995,7 @@ class AWSPRReviewerServer {
               expiration:
                 credentials?.expiration?.toISOString() || "No expiration",
             };
-            return {
-              content: [
-                { type: "text", text: JSON.stringify(status, null, 2) },
-              ],
-            };
+            return jsonResult(status);
           }
 
           default:
@@ -2116,6 +2019,20 @@ class AWSPRReviewerServer {
     }
   }
 
+  /**
+   * Returns the offset of every hunk header ("@@" at a line start) in a git diff.
+   * An indexOf scan, so no regex runs and nothing is allocated per line.
+   */
+  private findHunkStarts(gitDiff: string): number[] {
+    const hunkStarts: number[] = gitDiff.startsWith("@@") ? [0] : [];
+    let index = gitDiff.indexOf("\n@@");
+    while (index !== -1) {
+      hunkStarts.push(index + 1);
+      index = gitDiff.indexOf("\n@@", index + 1);
+    }
+    return hunkStarts;
+  }
+
   /**
    * Chunks a git diff into smaller pieces based on hunks
    * @param gitDiff Complete git diff string
@@ -2133,47 +2050,32 @@ class AWSPRReviewerServer {
     hasMore: boolean;
     nextChunkOffset?: number;
   } {
-    const lines = gitDiff.split("\n");
-    const headerLines: string[] = [];
-    const hunks: string[][] = [];
-    let currentHunk: string[] = [];
-    let inHunk = false;
-
-    // Separate header and hunks
-    for (const line of lines) {
-      if (line.startsWith("@@")) {
-        if (inHunk && currentHunk.length > 0) {
-          hunks.push([...currentHunk]);
-        }
-        currentHunk = [line];
-        inHunk = true;
-      } else if (inHunk) {
-        currentHunk.push(line);
-      } else {
-        headerLines.push(line);
-      }
-    }
+    // Slice the requested window straight out of the string, so only the
+    // returned chunk is copied rather than every line of the diff
+    const hunkStarts = this.findHunkStarts(gitDiff);
 
-    // Add the last hunk
-    if (inHunk && currentHunk.length > 0) {
-      hunks.push(currentHunk);
-    }
-
-    const totalHunks = hunks.length;
+    const totalHunks = hunkStarts.length;
     const startIndex = Math.max(0, chunkOffset - 1); // Convert to 0-based
     const endIndex = Math.min(totalHunks, startIndex + chunkLimit);
 
-    // Build chunked response
-    const chunkLines = [...headerLines];
-    for (let i = startIndex; i < endIndex; i++) {
-      chunkLines.push(...hunks[i]);
+    // Build chunked response: header lines, then the selected run of hunks
+    const parts: string[] = [];
+    if (totalHunks === 0) {
+      parts.push(gitDiff);
+    } else if (hunkStarts[0] > 0) {
+      parts.push(gitDiff.slice(0, hunkStarts[0] - 1));
+    }
+    if (startIndex < endIndex) {
+      const hunksEnd =
+        endIndex < totalHunks ? hunkStarts[endIndex] - 1 : gitDiff.length;
+      parts.push(gitDiff.slice(hunkStarts[startIndex], hunksEnd));
     }
 
     const hasMore = endIndex < totalHunks;
     const nextChunkOffset = hasMore ? endIndex + 1 : undefined;
 
     return {
-      chunk: chunkLines.join("\n"),
+      chunk: parts.join("\n"),
       totalHunks,
       hasMore,
       nextChunkOffset,
@@ -2189,7 +2091,10 @@ class AWSPRReviewerServer {
 
     // Keep the same config but force fresh initialization
     this.repositoryService = new RepositoryService(this.authManager);
-    this.pullRequestService = new PullRequestService(this.authManager);
+    this.pullRequestService = new PullRequestService(
+      this.authManager,
+      this.repositoryService
+    );
     this.diffAnalyzer = new IntelligentDiffAnalyzer(this.repositoryService);
 
     console.error("All services reinitialized successfully");
@@ -22,6 +22,7 @@ import {
 import { AWSAuthManager } from "../auth/aws-auth.js";
 import { RepositoryService } from "./repository-service.js";
 import { LinePositionCalculator } from "../utils/line-position-calculator.js";
+import { TTLCache } from "../utils/cache.js";
 import {
   PullRequest,
   PullRequestComment,
@@ -31,12 +32,29 @@ import {
   ApprovalState,
 } from "../types";
 
+// Review sessions call several tools on the same PR back to back; a short TTL keeps
+// those lookups local while still picking up pushes made elsewhere
+const PULL_REQUEST_CACHE_TTL_MS = 30 * 1000;
+const PULL_REQUEST_CACHE_MAX_ENTRIES = 128;
+
 export class PullRequestService {
   private repositoryService: RepositoryService;
   private linePositionCalculator: LinePositionCalculator;
-
-  constructor(private authManager: AWSAuthManager) {
-    this.repositoryService = new RepositoryService(authManager);
+  private pendingPullRequests = new Map<string, Promise<PullRequest>>();
+  // Bumped on every update or merge; a fetch only caches its result if no write happened meanwhile
+  private pullRequestGenerations = new Map<string, number>();
+  private pullRequestCache = new TTLCache<string, PullRequest>({
+    ttlMs: PULL_REQUEST_CACHE_TTL_MS,
+    maxEntries: PULL_REQUEST_CACHE_MAX_ENTRIES,
+  });
+
+  constructor(
+    private authManager: AWSAuthManager,
+    repositoryService?: RepositoryService
+  ) {
+    // Share the caller's RepositoryService so file reads reuse its caches
+    this.repositoryService =
+      repositoryService || new RepositoryService(authManager);
     this.linePositionCalculator = new LinePositionCalculator(
       this.repositoryService
     );
@@ -63,7 +81,38 @@ export class PullRequestService {
     };
   }
 
+  /**
+   * Recently fetched pull requests are served from a short-lived cache, and concurrent
+   * lookups of the same pull request (e.g. a client walking its files in parallel)
+   * share one in-flight GetPullRequest call instead of each issuing their own.
+   */
   async getPullRequest(pullRequestId: string): Promise<PullRequest> {
+    const cached = this.pullRequestCache.get(pullRequestId);
+    if (cached) {
+      return cached;
+    }
+
+    const pending = this.pendingPullRequests.get(pullRequestId);
+    if (pending) {
+      return pending;
+    }
+
+    const request: Promise<PullRequest> = this.fetchPullRequest(pullRequestId).finally(() => {
+      // An update may have replaced this entry with a newer fetch; leave that one in place
+      if (this.pendingPullRequests.get(pullRequestId) === request) {
+        this.pendingPullRequests.delete(pullRequestId);
+      }
+    });
+    this.pendingPullRequests.set(pullRequestId, request);
+    return request;
+  }
+
+  /**
+   * Always calls GetPullRequest and refreshes the cached copy, so updates made through
+   * this service are visible to the next getPullRequest.
+   */
+  private async fetchPullRequest(pullRequestId: string): Promise<PullRequest> {
+    const generation = this.pullRequestGenerations.get(pullRequestId) ?? 0;
     const client = await this.authManager.getClient();
     const command = new GetPullRequestCommand({ pullRequestId });
 
@@ -74,7 +123,7 @@ export class PullRequestService {
       throw new Error(`Pull request ${pullRequestId} not found`);
     }
 
-    return {
+    const pullRequest: PullRequest = {
       pullRequestId: pr.pullRequestId || "",
       title: pr.title || "",
       description: pr.description,
@@ -110,6 +159,24 @@ export class PullRequestService {
         lastModifiedUser: rule.lastModifiedUser,
       })),
     };
+
+    // A response that raced an update or merge may predate it, so it is not cached
+    if ((this.pullRequestGenerations.get(pullRequestId) ?? 0) === generation) {
+      this.pullRequestCache.set(pullRequestId, pullRequest);
+    }
+    return pullRequest;
+  }
+
+  /**
+   * Forgets the cached and in-flight copies of a pull request after it was changed.
+   */
+  private invalidatePullRequest(pullRequestId: string): void {
+    this.pullRequestCache.delete(pullRequestId);
+    this.pendingPullRequests.delete(pullRequestId);
+    this.pullRequestGenerations.set(
+      pullRequestId,
+      (this.pullRequestGenerations.get(pullRequestId) ?? 0) + 1
+    );
   }
 
   async createPullRequest(
@@ -154,7 +221,7 @@ export class PullRequestService {
     });
 
     await client.send(command);
-    return await this.getPullRequest(pullRequestId);
+    return await this.refreshAfterUpdate(pullRequestId);
   }
 
   async updatePullRequestDescription(
@@ -168,7 +235,7 @@ export class PullRequestService {
     });
 
     await client.send(command);
-    return await this.getPullRequest(pullRequestId);
+    return await this.refreshAfterUpdate(pullRequestId);
   }
 
   async closePullRequest(pullRequestId: string): Promise<PullRequest> {
@@ -179,7 +246,7 @@ export class PullRequestService {
     });
 
     await client.send(command);
-    return await this.getPullRequest(pullRequestId);
+    return await this.refreshAfterUpdate(pullRequestId);
   }
 
   async reopenPullRequest(pullRequestId: string): Promise<PullRequest> {
@@ -190,7 +257,15 @@ export class PullRequestService {
     });
 
     await client.send(command);
-    return await this.getPullRequest(pullRequestId);
+    return await this.refreshAfterUpdate(pullRequestId);
+  }
+
+  /**
+   * Drops cached copies of a just-updated pull request and returns a fresh one.
+   */
+  private async refreshAfterUpdate(pullRequestId: string): Promise<PullRequest> {
+    this.invalidatePullRequest(pullRequestId);
+    return await this.fetchPullRequest(pullRequestId);
   }
 
   async getComments(
@@ -227,11 +302,21 @@ export class PullRequestService {
 
     const response = await client.send(command);
 
+    // Location is reported once per comment group, so map it once and share it
     const comments: PullRequestComment[] = (
       response.commentsForPullRequestData || []
-    )
-      .flatMap((data) => data.comments || [])
-      .map((comment) => ({
+    ).flatMap((data) => {
+      const location = data.location
+        ? {
+            filePath: data.location.filePath || "",
+            filePosition: data.location.filePosition,
+            relativeFileVersion: data.location.relativeFileVersion as
+              | "BEFORE"
+              | "AFTER",
+          }
+        : undefined;
+
+      return (data.comments || []).map((comment) => ({
         commentId: comment.commentId || "",
         content: comment.content || "",
         inReplyTo: comment.inReplyTo,
@@ -244,15 +329,9 @@ export class PullRequestService {
         repositoryName,
         beforeCommitId,
         afterCommitId,
-        location: (comment as any).location
-          ? {
-              filePath: (comment as any).location.filePath || "",
-              filePosition: (comment as any).location.filePosition,
-              relativeFileVersion: (comment as any).location
-                .relativeFileVersion as "BEFORE" | "AFTER",
-            }
-          : undefined,
+        location,
       }));
+    });
 
     return {
       items: comments,
@@ -569,6 +648,7 @@ export class PullRequestService {
     }
 
     const response = await client.send(command);
+    this.invalidatePullRequest(pullRequestId);
     return {
       pullRequest: response.pullRequest,
       commitId: (response as any).commitId,
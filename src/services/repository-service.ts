@@ -7,12 +7,82 @@ import {
   GetDifferencesCommand,
   GetFileCommand,
   GetFolderCommand,
+  BlobMetadata as SdkBlobMetadata,
 } from '@aws-sdk/client-codecommit';
 import { AWSAuthManager } from '../auth/aws-auth.js';
-import { Repository, Branch, Commit, FileDifference, File, PaginatedResult, PaginationOptions } from '../types/index.js';
+import { Repository, Branch, Commit, BlobMetadata, FileDifference, File, FileContent, PaginatedResult, PaginationOptions } from '../types/index.js';
+import { TTLCache } from '../utils/cache.js';
+import { countLines, decodeText, isBinaryContent, sliceLines } from '../utils/file-content.js';
+import { createLimiter, mapWithConcurrency } from '../utils/concurrency.js';
 import * as treeify from 'treeify';
 
+const BRANCH_DETAILS_CONCURRENCY = 16;
+// GetFolder calls in flight across a whole tree walk, not per level
+const TREE_FOLDER_CONCURRENCY = 8;
+
+// Whole-repository trees can run to 100k+ entries; beyond this the response would blow MCP client token limits
+const MAX_TREE_LINES = 2000;
+
+// Difference pages are cached only between full commit IDs; branch names move with every push
+const DIFFERENCES_CACHE_TTL_MS = 5 * 60 * 1000;
+const DIFFERENCES_CACHE_MAX_CHAINS = 64;
+// Pages requested ahead of the one asked for; the window slides forward only as the caller pages
+const DIFFERENCES_PREFETCH_PAGES = 1;
+// Keeps a client paging through a huge changeset from holding every page for the TTL
+const DIFFERENCES_CHAIN_MAX_PAGES = 100;
+
+// File contents at a full commit SHA never change, so they can be reused across chunked reads
+const COMMIT_SHA_PATTERN = /^[0-9a-f]{40}$/i;
+const FILE_CACHE_TTL_MS = 10 * 60 * 1000;
+const FILE_CACHE_MAX_ENTRIES = 256;
+const FILE_CACHE_MAX_CHARS = 64 * 1024 * 1024;
+
+/**
+ * True for full commit IDs, whose contents are immutable (unlike branch names).
+ */
+export function isCommitId(commitSpecifier: string): boolean {
+  return COMMIT_SHA_PATTERN.test(commitSpecifier);
+}
+
+// Maps one side of an SDK difference; read once per blob instead of re-reading each field off the diff
+function toBlob(blob: SdkBlobMetadata | undefined): BlobMetadata | undefined {
+  return blob ? {
+    blobId: blob.blobId || '',
+    path: blob.path || '',
+    mode: blob.mode || '',
+  } : undefined;
+}
+
+// Last path segment without building a split array per tree entry
+function baseName(absolutePath: string): string {
+  return absolutePath.slice(absolutePath.lastIndexOf('/') + 1) || absolutePath;
+}
+
+interface DifferencesQuery {
+  repositoryName: string;
+  beforeCommitSpecifier: string;
+  afterCommitSpecifier: string;
+  beforePath?: string;
+  afterPath?: string;
+  maxResults: number;
+}
+
+interface DifferencesChain {
+  pages: Map<string, Promise<PaginatedResult<FileDifference>>>;
+}
+
 export class RepositoryService {
+  private differencesChains = new TTLCache<string, DifferencesChain>({
+    ttlMs: DIFFERENCES_CACHE_TTL_MS,
+    maxEntries: DIFFERENCES_CACHE_MAX_CHAINS,
+  });
+  private fileCache = new TTLCache<string, FileContent>({
+    ttlMs: FILE_CACHE_TTL_MS,
+    maxEntries: FILE_CACHE_MAX_ENTRIES,
+    maxSize: FILE_CACHE_MAX_CHARS,
+    sizeOf: file => file.content.length,
+  });
+
   constructor(private authManager: AWSAuthManager) {}
 
   async listRepositories(options: PaginationOptions = {}): Promise<PaginatedResult<Repository>> {
@@ -79,9 +149,11 @@ export class RepositoryService {
       commitId: '', // Will need to get commit ID separately
     }));
 
-    // Get commit IDs for each branch
-    const branchesWithCommits = await Promise.all(
-      branches.map(async (branch) => {
+    // Get commit IDs for each branch, a bounded number at a time to stay clear of throttling
+    const branchesWithCommits = await mapWithConcurrency(
+      branches,
+      BRANCH_DETAILS_CONCURRENCY,
+      async (branch) => {
         try {
           const branchDetails = await this.getBranch(repositoryName, branch.branchName);
           return branchDetails;
@@ -89,7 +161,7 @@ export class RepositoryService {
           console.error(`Failed to get details for branch ${branch.branchName}:`, error);
           return branch;
         }
-      })
+      }
     );
 
     return {
@@ -154,31 +226,135 @@ export class RepositoryService {
     afterPath?: string,
     options: PaginationOptions = {}
   ): Promise<PaginatedResult<FileDifference>> {
-    const client = await this.authManager.getClient();
-    const command = new GetDifferencesCommand({
+    const query: DifferencesQuery = {
       repositoryName,
       beforeCommitSpecifier,
       afterCommitSpecifier,
       beforePath,
       afterPath,
-      NextToken: options.nextToken,
-      MaxResults: options.maxResults || 100,
+      maxResults: options.maxResults || 100,
+    };
+    const pageKey = options.nextToken || '';
+
+    // A listing between branch names can change at any moment, so it is always fetched fresh
+    if (!isCommitId(beforeCommitSpecifier) || !isCommitId(afterCommitSpecifier)) {
+      return this.fetchDifferencesPage(query, pageKey);
+    }
+
+    const chainKey = JSON.stringify(query);
+
+    let chain = this.differencesChains.get(chainKey);
+    if (!chain) {
+      chain = { pages: new Map() };
+      this.differencesChains.set(chainKey, chain);
+    }
+
+    const page = chain.pages.get(pageKey) || this.trackDifferencesPage(chain, query, pageKey);
+    // An explicit page size asks for exactly that page, so nothing is fetched ahead of it
+    this.prefetchDifferences(chain, query, page, options.maxResults ? 0 : DIFFERENCES_PREFETCH_PAGES);
+    return page;
+  }
+
+  /**
+   * Iterates every difference between two commits, following NextToken internally.
+   * Between commit IDs, pages come from the getDifferences cache, so the walk reuses prefetched pages.
+   */
+  async *iterateDifferences(
+    repositoryName: string,
+    beforeCommitSpecifier: string,
+    afterCommitSpecifier: string,
+    beforePath?: string,
+    afterPath?: string
+  ): AsyncGenerator<FileDifference> {
+    // A token handed back twice would loop forever, so each one is followed only once
+    const seenTokens = new Set<string>();
+    let nextToken: string | undefined;
+    do {
+      const page = await this.getDifferences(
+        repositoryName,
+        beforeCommitSpecifier,
+        afterCommitSpecifier,
+        beforePath,
+        afterPath,
+        { nextToken }
+      );
+      yield* page.items;
+      nextToken = page.nextToken;
+      if (nextToken && seenTokens.has(nextToken)) {
+        console.error(`GetDifferences returned repeated nextToken; stopping after ${seenTokens.size + 1} pages`);
+        return;
+      }
+      if (nextToken) {
+        seenTokens.add(nextToken);
+      }
+    } while (nextToken);
+  }
+
+  /**
+   * Starts fetching one page of a chain and caches its promise under the page token.
+   */
+  private trackDifferencesPage(
+    chain: DifferencesChain,
+    query: DifferencesQuery,
+    token: string
+  ): Promise<PaginatedResult<FileDifference>> {
+    const page = this.fetchDifferencesPage(query, token);
+    chain.pages.set(token, page);
+    if (chain.pages.size > DIFFERENCES_CHAIN_MAX_PAGES) {
+      // Map keeps insertion order, so the first key is the oldest page
+      chain.pages.delete(chain.pages.keys().next().value as string);
+    }
+    // Drop failed pages so the next request retries instead of replaying the error
+    page.catch(() => chain.pages.delete(token));
+    return page;
+  }
+
+  /**
+   * Requests up to `count` pages past `page` in the background, so the next page a
+   * caller asks for is already in flight. Pages already in the chain are not refetched.
+   */
+  private prefetchDifferences(
+    chain: DifferencesChain,
+    query: DifferencesQuery,
+    page: Promise<PaginatedResult<FileDifference>>,
+    count: number
+  ): void {
+    if (count <= 0) {
+      return;
+    }
+    page.then(
+      (result) => {
+        if (result.nextToken && !chain.pages.has(result.nextToken)) {
+          const next = this.trackDifferencesPage(chain, query, result.nextToken);
+          this.prefetchDifferences(chain, query, next, count - 1);
+        }
+      },
+      // The caller awaiting this page sees the error; prefetching just stops
+      () => undefined
+    );
+  }
+
+  private async fetchDifferencesPage(
+    query: DifferencesQuery,
+    nextToken: string
+  ): Promise<PaginatedResult<FileDifference>> {
+    const client = await this.authManager.getClient();
+    const command = new GetDifferencesCommand({
+      repositoryName: query.repositoryName,
+      beforeCommitSpecifier: query.beforeCommitSpecifier,
+      afterCommitSpecifier: query.afterCommitSpecifier,
+      beforePath: query.beforePath,
+      afterPath: query.afterPath,
+      NextToken: nextToken || undefined,
+      MaxResults: query.maxResults,
     });
 
     const response = await client.send(command);
     
     const differences: FileDifference[] = (response.differences || []).map(diff => ({
       changeType: diff.changeType as 'A' | 'D' | 'M',
-      beforeBlob: diff.beforeBlob ? {
-        blobId: diff.beforeBlob.blobId || '',
-        path: diff.beforeBlob.path || '',
-        mode: diff.beforeBlob.mode || '',
-      } : undefined,
-      afterBlob: diff.afterBlob ? {
-        blobId: diff.afterBlob.blobId || '',
-        path: diff.afterBlob.path || '',
-        mode: diff.afterBlob.mode || '',
-      } : undefined,
+      beforeBlob: toBlob(diff.beforeBlob),
+      afterBlob: toBlob(diff.afterBlob),
     }));
 
     return {
@@ -187,7 +363,16 @@ export class RepositoryService {
     };
   }
 
-  async getFile(repositoryName: string, commitSpecifier: string, filePath: string): Promise<{ content: string; blobId: string }> {
+  async getFile(repositoryName: string, commitSpecifier: string, filePath: string): Promise<FileContent> {
+    // Branch names move, so only immutable commit IDs are cacheable
+    const cacheKey = isCommitId(commitSpecifier)
+      ? `${repositoryName}\0${commitSpecifier.toLowerCase()}\0${filePath}`
+      : undefined;
+    const cached = cacheKey ? this.fileCache.get(cacheKey) : undefined;
+    if (cached) {
+      return cached;
+    }
+
     const client = await this.authManager.getClient();
     const command = new GetFileCommand({
       repositoryName,
@@ -201,12 +386,22 @@ export class RepositoryService {
       throw new Error(`File ${filePath} not found at commit ${commitSpecifier}`);
     }
 
-    const content = Buffer.from(response.fileContent).toString('utf8');
+    // Binary content is detected on the raw bytes and never decoded
+    const bytes = response.fileContent;
+    const isBinary = isBinaryContent(bytes);
+    const content = isBinary ? '' : decodeText(bytes);
     
-    return {
+    const file: FileContent = {
       content,
       blobId: response.blobId || '',
+      size: bytes.byteLength,
+      isBinary,
     };
+    if (cacheKey) {
+      this.fileCache.set(cacheKey, file);
+    }
+
+    return file;
   }
 
   async getFolder(repositoryName: string, commitSpecifier: string, folderPath: string): Promise<File[]> {
@@ -243,9 +438,10 @@ export class RepositoryService {
   async searchRepositories(searchTerm: string, options: PaginationOptions = {}): Promise<PaginatedResult<Repository>> {
     const allRepos = await this.listRepositories(options);
     
+    const term = searchTerm.toLowerCase();
     const filteredRepos = allRepos.items.filter(repo => 
-      repo.repositoryName.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      (repo.repositoryDescription && repo.repositoryDescription.toLowerCase().includes(searchTerm.toLowerCase()))
+      repo.repositoryName.toLowerCase().includes(term) ||
+      (repo.repositoryDescription && repo.repositoryDescription.toLowerCase().includes(term))
     );
 
     return {
@@ -267,7 +463,8 @@ export class RepositoryService {
         commitSpecifier, 
         treePath === "/" ? "" : treePath, 
         0, 
-        maxDepth || 10
+        maxDepth || 10,
+        createLimiter(TREE_FOLDER_CONCURRENCY)
       );
       
       // Format with treeify
@@ -275,6 +472,22 @@ export class RepositoryService {
       
       // Count files and folders
       const counts = this.countFilesAndFolders(tree);
+
+      const totalLines = countLines(treeFormatted);
+      if (totalLines > MAX_TREE_LINES) {
+        // Return only the first lines and drop the raw structure, which would repeat every entry
+        return {
+          repositoryName,
+          commitSpecifier,
+          treePath,
+          maxDepth,
+          totalFiles: counts.files,
+          totalFolders: counts.folders,
+          treeFormatted: sliceLines(treeFormatted, 1, MAX_TREE_LINES).join('\n'),
+          truncated: true,
+          truncationNotice: `Showing the first ${MAX_TREE_LINES} of ${totalLines} tree lines. Use a narrower treePath or a smaller treeDepth to see the rest.`
+        };
+      }
       
       return {
         repositoryName,
@@ -361,7 +574,8 @@ export class RepositoryService {
     commitSpecifier: string,
     folderPath: string,
     currentDepth: number,
-    maxDepth: number
+    maxDepth: number,
+    limit: <T>(task: () => Promise<T>) => Promise<T>
   ): Promise<any> {
     const client = await this.authManager.getClient();
     const tree: any = {};
@@ -377,32 +591,34 @@ export class RepositoryService {
         folderPath: folderPath || "/",
       });
       
-      const response = await client.send(command);
+      const response = await limit(() => client.send(command));
       
       // Add files
       if (response.files) {
         for (const file of response.files) {
           if (file.absolutePath) {
-            const fileName = file.absolutePath.split('/').pop() || file.absolutePath;
+            const fileName = baseName(file.absolutePath);
             tree[fileName] = null; // null indicates it's a file for treeify
           }
         }
       }
       
-      // Add subfolders recursively
+      // Add subfolders recursively; siblings are fetched concurrently, then added in listing order
       if (response.subFolders) {
-        for (const folder of response.subFolders) {
-          if (folder.absolutePath) {
-            const folderName = folder.absolutePath.split('/').pop() || folder.absolutePath;
-            tree[folderName] = await this.buildTreeRecursively(
-              repositoryName,
-              commitSpecifier,
-              folder.absolutePath,
-              currentDepth + 1,
-              maxDepth
-            );
-          }
-        }
+        const subFolders = response.subFolders.filter(folder => folder.absolutePath);
+        const subTrees = await Promise.all(subFolders.map(folder =>
+          this.buildTreeRecursively(
+            repositoryName,
+            commitSpecifier,
+            folder.absolutePath!,
+            currentDepth + 1,
+            maxDepth,
+            limit
+          )
+        ));
+        subFolders.forEach((folder, index) => {
+          tree[baseName(folder.absolutePath!)] = subTrees[index];
+        });
       }
     } catch (error) {
       console.error(`Error getting folder ${folderPath}:`, error);
@@ -446,13 +662,19 @@ export class RepositoryService {
       switch (type) {
         case 'regex':
           // Handle regex patterns
-          if (pattern.startsWith('/') && pattern.includes('/', 1)) {
-            const lastSlash = pattern.lastIndexOf('/');
-            const regexPattern = pattern.slice(1, lastSlash);
-            const flags = pattern.slice(lastSlash + 1);
-            searchRegex = new RegExp(regexPattern, flags);
-          } else {
-            searchRegex = new RegExp(pattern, caseSensitive ? 'g' : 'gi');
+          try {
+            if (pattern.startsWith('/') && pattern.includes('/', 1)) {
+              const lastSlash = pattern.lastIndexOf('/');
+              const regexPattern = pattern.slice(1, lastSlash);
+              const flags = pattern.slice(lastSlash + 1);
+              searchRegex = new RegExp(regexPattern, flags);
+            } else {
+              searchRegex = new RegExp(pattern, caseSensitive ? 'g' : 'gi');
+            }
+          } catch (error) {
+            // An invalid pattern is searched as literal text rather than failing the whole search
+            console.error(`Invalid regex '${pattern}', searching as literal text:`, error);
+            searchRegex = new RegExp(pattern.replace(/[.*+?^${}()|[\]\\]/g, '\\$&'), caseSensitive ? 'g' : 'gi');
           }
           break;
         case 'function':
@@ -473,9 +695,9 @@ export class RepositoryService {
           break;
       }
       
-      lines.forEach((line, lineIndex) => {
-        if (matches.length >= maxResults) return;
-        
+      // The regex is compiled once above; stop scanning as soon as enough matches are found
+      for (let lineIndex = 0; lineIndex < lines.length && matches.length < maxResults; lineIndex++) {
+        const line = lines[lineIndex];
         const lineMatches = line.match(searchRegex);
         if (lineMatches) {
           const contextStart = Math.max(0, lineIndex - contextLines);
@@ -493,7 +715,7 @@ export class RepositoryService {
             context
           });
         }
-      });
+      }
     } catch (error) {
       console.error(`Error creating search regex for pattern '${pattern}':`, error);
     }
@@ -142,6 +142,13 @@ export interface File {
   fileMode: string;
 }
 
+export interface FileContent {
+  content: string;
+  blobId: string;
+  size: number;
+  isBinary: boolean;
+}
+
 export interface PaginationOptions {
   nextToken?: string;
   maxResults?: number;
@@ -0,0 +1,77 @@
+export interface TTLCacheOptions<V> {
+  ttlMs: number;
+  maxEntries: number;
+  /** Optional total size budget, measured with sizeOf (e.g. string length) */
+  maxSize?: number;
+  sizeOf?: (value: V) => number;
+}
+
+interface CacheEntry<V> {
+  value: V;
+  expiresAt: number;
+  size: number;
+}
+
+/**
+ * Small TTL + LRU cache. Map preserves insertion order, so re-inserting on read
+ * keeps the least recently used entry first and eviction is O(1).
+ */
+export class TTLCache<K, V> {
+  private entries = new Map<K, CacheEntry<V>>();
+  private totalSize = 0;
+
+  constructor(private options: TTLCacheOptions<V>) {}
+
+  get(key: K): V | undefined {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      return undefined;
+    }
+
+    this.entries.delete(key);
+    if (entry.expiresAt <= Date.now()) {
+      this.totalSize -= entry.size;
+      return undefined;
+    }
+
+    this.entries.set(key, entry);
+    return entry.value;
+  }
+
+  set(key: K, value: V): void {
+    const size = this.options.sizeOf ? this.options.sizeOf(value) : 0;
+    if (this.options.maxSize !== undefined && size > this.options.maxSize) {
+      // Never worth evicting everything else for a single oversized value
+      this.delete(key);
+      return;
+    }
+
+    this.delete(key);
+    this.entries.set(key, { value, expiresAt: Date.now() + this.options.ttlMs, size });
+    this.totalSize += size;
+
+    while (
+      this.entries.size > this.options.maxEntries ||
+      (this.options.maxSize !== undefined && this.totalSize > this.options.maxSize)
+    ) {
+      this.delete(this.entries.keys().next().value as K);
+    }
+  }
+
+  delete(key: K): void {
+    const entry = this.entries.get(key);
+    if (entry) {
+      this.totalSize -= entry.size;
+      this.entries.delete(key);
+    }
+  }
+
+  clear(): void {
+    this.entries.clear();
+    this.totalSize = 0;
+  }
+
+  get size(): number {
+    return this.entries.size;
+  }
+}
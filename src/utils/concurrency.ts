@@ -0,0 +1,57 @@
+/**
+ * Maps items through an async function with at most `limit` calls in flight,
+ * preserving input order in the result. Keeps fan-outs over AWS APIs below
+ * the request rates that trigger throttling.
+ */
+export async function mapWithConcurrency<T, R>(
+  items: readonly T[],
+  limit: number,
+  fn: (item: T, index: number) => Promise<R>
+): Promise<R[]> {
+  const results: R[] = new Array(items.length);
+  let next = 0;
+
+  const worker = async () => {
+    while (next < items.length) {
+      const index = next++;
+      results[index] = await fn(items[index], index);
+    }
+  };
+
+  const workers = Array.from({ length: Math.min(limit, items.length) }, worker);
+  await Promise.all(workers);
+  return results;
+}
+
+/**
+ * Returns a limiter that runs at most `limit` tasks at once across every caller
+ * sharing it. Unlike mapWithConcurrency this bounds recursive fan-outs, where each
+ * level would otherwise multiply the number of requests in flight.
+ */
+export function createLimiter(limit: number): <T>(task: () => Promise<T>) => Promise<T> {
+  let active = 0;
+  const queue: Array<() => void> = [];
+
+  // A finishing task hands its slot straight to the next queued one
+  const release = () => {
+    const next = queue.shift();
+    if (next) {
+      next();
+    } else {
+      active--;
+    }
+  };
+
+  return async <T>(task: () => Promise<T>): Promise<T> => {
+    if (active >= limit) {
+      await new Promise<void>(resolve => queue.push(resolve));
+    } else {
+      active++;
+    }
+    try {
+      return await task();
+    } finally {
+      release();
+    }
+  };
+}
@@ -10,76 +10,71 @@ export class AWSCodeCommitError extends Error {
   }
 }
 
-export function handleAWSError(error: any): never {
-  if (error.name === "RepositoryDoesNotExistException") {
-    throw new AWSCodeCommitError(
-      `Repository does not exist: ${error.message}`,
-      "REPOSITORY_NOT_FOUND",
-      404,
-      error
-    );
-  }
-
-  if (error.name === "PullRequestDoesNotExistException") {
-    throw new AWSCodeCommitError(
-      `Pull request does not exist: ${error.message}`,
-      "PULL_REQUEST_NOT_FOUND",
-      404,
-      error
-    );
-  }
-
-  if (error.name === "BranchDoesNotExistException") {
-    throw new AWSCodeCommitError(
-      `Branch does not exist: ${error.message}`,
-      "BRANCH_NOT_FOUND",
-      404,
-      error
-    );
-  }
+// AWS exception name -> message prefix, error code and HTTP status
+const AWS_ERROR_MAP: Record<
+  string,
+  { prefix: string; code: string; statusCode: number }
+> = {
+  RepositoryDoesNotExistException: {
+    prefix: "Repository does not exist",
+    code: "REPOSITORY_NOT_FOUND",
+    statusCode: 404,
+  },
+  PullRequestDoesNotExistException: {
+    prefix: "Pull request does not exist",
+    code: "PULL_REQUEST_NOT_FOUND",
+    statusCode: 404,
+  },
+  BranchDoesNotExistException: {
+    prefix: "Branch does not exist",
+    code: "BRANCH_NOT_FOUND",
+    statusCode: 404,
+  },
+  CommitDoesNotExistException: {
+    prefix: "Commit does not exist",
+    code: "COMMIT_NOT_FOUND",
+    statusCode: 404,
+  },
+  FileDoesNotExistException: {
+    prefix: "File does not exist",
+    code: "FILE_NOT_FOUND",
+    statusCode: 404,
+  },
+  AccessDeniedException: {
+    prefix: "Access denied",
+    code: "ACCESS_DENIED",
+    statusCode: 403,
+  },
+  InvalidParameterException: {
+    prefix: "Invalid parameter",
+    code: "INVALID_PARAMETER",
+    statusCode: 400,
+  },
+};
+
+// AWS SDK errors that should be retried
+const RETRYABLE_ERROR_NAMES = new Set([
+  "ThrottlingException",
+  "TooManyRequestsException",
+  "ServiceUnavailableException",
+  "InternalServerError",
+  "RequestTimeout",
+]);
 
-  if (error.name === "CommitDoesNotExistException") {
-    throw new AWSCodeCommitError(
-      `Commit does not exist: ${error.message}`,
-      "COMMIT_NOT_FOUND",
-      404,
-      error
-    );
-  }
-
-  if (error.name === "FileDoesNotExistException") {
-    throw new AWSCodeCommitError(
-      `File does not exist: ${error.message}`,
-      "FILE_NOT_FOUND",
-      404,
-      error
-    );
-  }
-
-  if (error.name === "AccessDeniedException") {
-    throw new AWSCodeCommitError(
-      `Access denied: ${error.message}`,
-      "ACCESS_DENIED",
-      403,
-      error
-    );
-  }
-
-  if (error.name === "InvalidParameterException") {
+export function handleAWSError(error: any): never {
+  const mapped = Object.prototype.hasOwnProperty.call(AWS_ERROR_MAP, error.name)
+    ? AWS_ERROR_MAP[error.name]
+    : undefined;
+  if (mapped) {
     throw new AWSCodeCommitError(
-      `Invalid parameter: ${error.message}`,
-      "INVALID_PARAMETER",
-      400,
+      `${mapped.prefix}: ${error.message}`,
+      mapped.code,
+      mapped.statusCode,
       error
     );
   }
 
-  if (
-    error.name === "CredentialsError" ||
-    error.name === "UnauthorizedOperation" ||
-    error.name === "TokenRefreshRequired" ||
-    error.message?.includes("security token included in the request is expired")
-  ) {
+  if (isCredentialsError(error)) {
     throw new AWSCodeCommitError(
       `AWS credentials error (possibly expired): ${error.message}. Please run aws_creds_refresh to update credentials.`,
       "CREDENTIALS_ERROR",
@@ -97,18 +92,36 @@ export function handleAWSError(error: any): never {
   );
 }
 
+export function isCredentialsError(error: any): boolean {
+  return (
+    error?.name === "CredentialsError" ||
+    error?.name === "UnauthorizedOperation" ||
+    error?.name === "TokenRefreshRequired" ||
+    error?.message?.includes("security token included in the request is expired")
+  );
+}
+
+/**
+ * Failures that would hit every call the same way (bad credentials, missing
+ * permissions, throttling), so per-file fallbacks should surface them instead.
+ */
+export function isRequestLevelError(error: any): boolean {
+  return (
+    isCredentialsError(error) ||
+    error?.name === "AccessDeniedException" ||
+    RETRYABLE_ERROR_NAMES.has(error?.name)
+  );
+}
+
 export function isRetryableError(error: any): boolean {
-  // AWS SDK errors that should be retried
-  const retryableCodes = [
-    "ThrottlingException",
-    "TooManyRequestsException",
-    "ServiceUnavailableException",
-    "InternalServerError",
-    "RequestTimeout",
-  ];
+  // The SDK already retried this call with its own backoff; retrying again only
+  // multiplies requests against a service that is throttling us
+  if (error.$metadata?.attempts > 1) {
+    return false;
+  }
 
   return (
-    retryableCodes.includes(error.name) ||
+    RETRYABLE_ERROR_NAMES.has(error.name) ||
     (error.$metadata?.httpStatusCode >= 500 &&
       error.$metadata?.httpStatusCode < 600)
   );
@@ -141,8 +154,36 @@ export async function retryWithBackoff<T>(
   } catch (e) {
     return {
       content: [
-        { type: "text", error: `**Error :** ${JSON.stringify(e, null, 2)}` },
+        {
+          type: "text",
+          text: `**Error :** ${JSON.stringify(describeError(e), null, 2)}`,
+        },
       ],
+      isError: true,
     } as T;
   }
 }
+
+/**
+ * Serializable error details for tool responses. Error name and message are
+ * non-enumerable, so JSON.stringify(error) on its own renders them as "{}".
+ */
+function describeError(error: any) {
+  const mapped =
+    error && Object.prototype.hasOwnProperty.call(AWS_ERROR_MAP, error.name)
+      ? AWS_ERROR_MAP[error.name]
+      : undefined;
+  const credentials = isCredentialsError(error);
+
+  return {
+    name: error?.name,
+    message: mapped
+      ? `${mapped.prefix}: ${error.message}`
+      : error?.message ?? String(error),
+    code: mapped?.code ?? (credentials ? "CREDENTIALS_ERROR" : error?.code),
+    statusCode: mapped?.statusCode ?? error?.$metadata?.httpStatusCode,
+    hint: credentials
+      ? "Please run aws_creds_refresh to update credentials."
+      : undefined,
+  };
+}
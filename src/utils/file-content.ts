@@ -0,0 +1,179 @@
+import { FileContent } from '../types/index.js';
+
+// Extensions that never produce a meaningful line diff; looked up once per path in O(1).
+// analyzeFileDiff skips listed paths without fetching them, so only unambiguous formats belong
+// here: extensions like .dat or .db are often text, and binary ones are still caught after
+// download by the isBinaryContent sniff
+const BINARY_EXTENSIONS: ReadonlySet<string> = new Set([
+  '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.ico', '.webp', '.tiff', '.psd',
+  '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
+  '.zip', '.tar', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.rar', '.jar', '.war',
+  '.exe', '.dll', '.so', '.dylib', '.bin', '.o', '.a', '.class', '.pyc', '.wasm',
+  '.mp3', '.mp4', '.wav', '.ogg', '.avi', '.mov', '.mkv', '.flac',
+  '.ttf', '.otf', '.woff', '.woff2', '.eot',
+  '.sqlite',
+]);
+
+// Longer suffixes cannot match, so they are rejected before slicing and lowercasing
+const MAX_BINARY_EXTENSION_LENGTH = Math.max(...Array.from(BINARY_EXTENSIONS, ext => ext.length));
+
+/**
+ * Checks the file extension against known binary formats.
+ */
+export function isLikelyBinaryPath(filePath: string): boolean {
+  const dot = filePath.lastIndexOf('.');
+  if (dot === -1 || filePath.length - dot > MAX_BINARY_EXTENSION_LENGTH || dot < filePath.lastIndexOf('/')) {
+    return false;
+  }
+  return BINARY_EXTENSIONS.has(filePath.slice(dot).toLowerCase());
+}
+
+// Same heuristic git uses: a NUL byte in the first 8000 bytes marks the content as binary
+const BINARY_SNIFF_BYTES = 8000;
+
+/**
+ * Sniffs raw bytes for binary content before anything is decoded.
+ */
+export function isBinaryContent(bytes: Uint8Array): boolean {
+  return bytes.subarray(0, BINARY_SNIFF_BYTES).includes(0);
+}
+
+// fatal: invalid UTF-8 throws instead of silently becoming U+FFFD; a leading BOM is dropped
+const UTF8_DECODER = new TextDecoder('utf-8', { fatal: true });
+
+// Windows-1252 differs from Latin-1 only in bytes 0x80-0x9F (smart quotes, euro sign, dashes);
+// the five bytes it leaves undefined keep their Latin-1 code points, as in the WHATWG mapping
+const WINDOWS_1252_HIGH_CONTROLS =
+  '\u20AC\u0081\u201A\u0192\u201E\u2026\u2020\u2021\u02C6\u2030\u0160\u2039\u0152\u008D\u017D\u008F' +
+  '\u0090\u2018\u2019\u201C\u201D\u2022\u2013\u2014\u02DC\u2122\u0161\u203A\u0153\u009D\u017E\u0178';
+const C1_CONTROL_PATTERN = /[\u0080-\u009f]/g;
+
+/**
+ * Decodes file bytes as UTF-8 in a single validating pass, falling back to
+ * Windows-1252 (a superset of Latin-1) for files that are not valid UTF-8.
+ */
+export function decodeText(bytes: Uint8Array): string {
+  try {
+    return UTF8_DECODER.decode(bytes);
+  } catch {
+    // Not UTF-8; most likely a legacy Windows or Latin-1 file
+  }
+
+  // TextDecoder('windows-1252') is not used: Node 20+ decodes it as plain Latin-1
+  return Buffer.from(bytes.buffer, bytes.byteOffset, bytes.byteLength)
+    .toString('latin1')
+    .replace(C1_CONTROL_PATTERN, (char) => WINDOWS_1252_HIGH_CONTROLS[char.charCodeAt(0) - 0x80]);
+}
+
+// Minified or generated files can put megabytes on one line; chunked reads clamp each line to this
+const MAX_CHUNK_LINE_CHARS = 256 * 1024;
+
+/**
+ * Clamps over-long lines in place to MAX_CHUNK_LINE_CHARS, marking how much was cut.
+ * Returns the number of lines truncated.
+ */
+export function clampLongLines(lines: string[]): number {
+  let truncated = 0;
+  for (let i = 0; i < lines.length; i++) {
+    const line = lines[i];
+    if (line.length > MAX_CHUNK_LINE_CHARS) {
+      lines[i] = `${line.slice(0, MAX_CHUNK_LINE_CHARS)} [truncated ${line.length - MAX_CHUNK_LINE_CHARS} characters]`;
+      truncated++;
+    }
+  }
+  return truncated;
+}
+
+/**
+ * Renders lines in the AWS Console compatible "   N→content" format (1-based).
+ * Builds one string per line and joins once, instead of mapping through
+ * intermediate toString()/padStart() copies.
+ */
+export function formatWithLineNumbers(lines: string[], firstLineNumber: number = 1): string {
+  const parts: string[] = new Array(lines.length);
+  for (let i = 0; i < lines.length; i++) {
+    const lineNumber = firstLineNumber + i;
+    const padding = lineNumber < 10 ? '   ' : lineNumber < 100 ? '  ' : lineNumber < 1000 ? ' ' : '';
+    parts[i] = `${padding}${lineNumber}→${lines[i]}`;
+  }
+  return parts.join('\n');
+}
+
+/**
+ * Counts lines the same way content.split('\n').length would, without building the array.
+ */
+export function countLines(content: string): number {
+  let count = 1;
+  let index = content.indexOf('\n');
+  while (index !== -1) {
+    count++;
+    index = content.indexOf('\n', index + 1);
+  }
+  return count;
+}
+
+/**
+ * Returns lines startLine..endLine (1-based, inclusive) by locating newline offsets,
+ * so only the requested window is split rather than the whole file.
+ */
+export function sliceLines(content: string, startLine: number, endLine: number): string[] {
+  if (endLine < startLine) {
+    return [];
+  }
+
+  let start = 0;
+  for (let line = 1; line < startLine; line++) {
+    const next = content.indexOf('\n', start);
+    if (next === -1) {
+      return [];
+    }
+    start = next + 1;
+  }
+
+  let end = start;
+  for (let line = startLine; line <= endLine; line++) {
+    const next = content.indexOf('\n', end);
+    if (next === -1) {
+      end = content.length;
+      break;
+    }
+    end = line === endLine ? next : next + 1;
+  }
+
+  return content.slice(start, end).split('\n');
+}
+
+// Keyed by the FileContent object, which the file cache shares across reads of the same commit
+const lineStartsCache = new WeakMap<FileContent, number[]>();
+
+/**
+ * Offsets where each line of a file's content starts. Built with one newline scan per
+ * FileContent and reused, so repeated chunk reads of a cached file skip the scan.
+ * The array length is the line count (same as countLines).
+ */
+export function getLineStarts(file: FileContent): number[] {
+  let starts = lineStartsCache.get(file);
+  if (!starts) {
+    starts = [0];
+    let index = file.content.indexOf('\n');
+    while (index !== -1) {
+      starts.push(index + 1);
+      index = file.content.indexOf('\n', index + 1);
+    }
+    lineStartsCache.set(file, starts);
+  }
+  return starts;
+}
+
+/**
+ * sliceLines() for a FileContent, cutting the window straight from its line offsets.
+ */
+export function sliceFileLines(file: FileContent, startLine: number, endLine: number): string[] {
+  const starts = getLineStarts(file);
+  if (endLine < startLine || startLine < 1 || startLine > starts.length) {
+    return [];
+  }
+
+  const end = endLine < starts.length ? starts[endLine] - 1 : file.content.length;
+  return file.content.slice(starts[startLine - 1], end).split('\n');
+}
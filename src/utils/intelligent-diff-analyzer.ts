@@ -1,7 +1,30 @@
-import { RepositoryService } from "../services/repository-service.js";
+import {
+  RepositoryService,
+  isCommitId,
+} from "../services/repository-service.js";
 import { FileDifference } from "../types/index.js";
+import { TTLCache } from "./cache.js";
+import { isRequestLevelError } from "./error-handler.js";
+import { countLines, isLikelyBinaryPath } from "./file-content.js";
 import * as Diff from "diff";
 
+// Compiled once and anchored past leading whitespace, so per-line tests need no trim() copy
+const STRUCTURAL_DECLARATION_PATTERN =
+  /^\s*(class|function|def|public|private|protected|async|export)/;
+const STRUCTURAL_CHANGE_PATTERN =
+  /^\s*(import|export|class|interface|function|def|from|package)/;
+
+// Above this combined size a line diff can hold the event loop for noticeable time
+const ASYNC_DIFF_THRESHOLD_CHARS = 1_000_000;
+// Callback-mode diffs advance one edit distance per timer tick (about 1 ms each), so a
+// region with thousands of edits takes seconds; past this budget the region is reported
+// as a whole-block replacement instead of a minimal diff
+const ASYNC_DIFF_TIMEOUT_MS = 10_000;
+// Context lines around each hunk, matching git's default
+const UNIFIED_DIFF_CONTEXT_LINES = 3;
+
+type LineChange = { value: string; added?: boolean; removed?: boolean };
+
 export interface DiffChunk {
   type: "added" | "removed" | "modified" | "context";
   beforeLineStart: number;
@@ -48,8 +71,83 @@ export interface FileAnalysisContext {
 }
 
 export class IntelligentDiffAnalyzer {
+  // Chunked reads of one diff re-request the same analysis; keep recent ones for commit-ID pairs
+  private analysisCache = new TTLCache<string, IntelligentDiff>({
+    ttlMs: 60 * 1000,
+    maxEntries: 16,
+  });
+
   constructor(private repositoryService: RepositoryService) {}
 
+  /**
+   * Asks GetDifferences (scoped to a single path) how a file changed between two commits,
+   * so callers can skip fetching sides that don't exist. Returns null when the file is unchanged.
+   */
+  async resolveChangeType(
+    repositoryName: string,
+    beforeCommitId: string,
+    afterCommitId: string,
+    filePath: string
+  ): Promise<"A" | "D" | "M" | null> {
+    // Blob paths in GetDifferences are repository-relative, so "/src/a.ts" must match "src/a.ts"
+    const path = filePath.replace(/^\/+/, "");
+
+    // GetDifferences rejects a path missing from its commit, which is exactly the case
+    // for added (before side) and deleted (after side) files; scope to the other side then
+    const scopes: Array<[string | undefined, string | undefined]> = [
+      [path, path],
+      [undefined, path],
+      [path, undefined],
+    ];
+    for (let i = 0; ; i++) {
+      const [beforePath, afterPath] = scopes[i];
+      try {
+        return await this.findChangeType(
+          repositoryName,
+          beforeCommitId,
+          afterCommitId,
+          path,
+          beforePath,
+          afterPath
+        );
+      } catch (error: any) {
+        // A path in neither commit is a real error for the caller to report
+        if (
+          error?.name !== "PathDoesNotExistException" ||
+          i === scopes.length - 1
+        ) {
+          throw error;
+        }
+      }
+    }
+  }
+
+  private async findChangeType(
+    repositoryName: string,
+    beforeCommitId: string,
+    afterCommitId: string,
+    filePath: string,
+    beforePath?: string,
+    afterPath?: string
+  ): Promise<"A" | "D" | "M" | null> {
+    for await (const diff of this.repositoryService.iterateDifferences(
+      repositoryName,
+      beforeCommitId,
+      afterCommitId,
+      beforePath,
+      afterPath
+    )) {
+      if (
+        diff.afterBlob?.path === filePath ||
+        diff.beforeBlob?.path === filePath
+      ) {
+        return diff.changeType;
+      }
+    }
+
+    return null;
+  }
+
   /**
    * Analyzes file differences and provides intelligent recommendations
    * for the best approach to understand the changes
@@ -61,31 +159,55 @@ export class IntelligentDiffAnalyzer {
     filePath: string,
     changeType: "A" | "D" | "M"
   ): Promise<IntelligentDiff> {
-    let beforeContent = "";
-    let afterContent = "";
+    // Binary files have no line diff; skip fetching and diffing their content
+    if (isLikelyBinaryPath(filePath)) {
+      return this.createBinaryFileAnalysis(filePath, changeType);
+    }
+
+    const cacheKey =
+      isCommitId(beforeCommitId) && isCommitId(afterCommitId)
+        ? [
+            repositoryName,
+            beforeCommitId,
+            afterCommitId,
+            filePath,
+            changeType,
+          ].join("\0")
+        : undefined;
+    const cached = cacheKey ? this.analysisCache.get(cacheKey) : undefined;
+    if (cached) {
+      return cached;
+    }
 
     try {
-      // Get file contents based on change type
-      if (changeType !== "A") {
-        const beforeFile = await this.repositoryService.getFile(
-          repositoryName,
-          beforeCommitId,
-          filePath
-        );
-        beforeContent = beforeFile.content;
-      }
+      // Get file contents based on change type; both sides are fetched concurrently
+      const [beforeFile, afterFile] = await Promise.all([
+        changeType !== "A"
+          ? this.repositoryService.getFile(
+              repositoryName,
+              beforeCommitId,
+              filePath
+            )
+          : undefined,
+        changeType !== "D"
+          ? this.repositoryService.getFile(
+              repositoryName,
+              afterCommitId,
+              filePath
+            )
+          : undefined,
+      ]);
 
-      if (changeType !== "D") {
-        const afterFile = await this.repositoryService.getFile(
-          repositoryName,
-          afterCommitId,
-          filePath
-        );
-        afterContent = afterFile.content;
+      if (beforeFile?.isBinary || afterFile?.isBinary) {
+        return this.createBinaryFileAnalysis(filePath, changeType);
       }
 
-      // Perform line-by-line diff analysis using proper diff library
-      const diffResult = this.performLineDiffWithLibrary(beforeContent, afterContent);
+      const beforeContent = beforeFile?.content ?? "";
+      const afterContent = afterFile?.content ?? "";
+
+      // Diff once; the chunk analysis and the unified patch are both built from it
+      const changes = await this.diffLinesTrimmed(beforeContent, afterContent);
+      const diffResult = this.performLineDiffWithLibrary(changes);
       const chunks = diffResult.chunks;
       const summary = diffResult.summary;
       const recommendation = this.analyzeComplexity(
@@ -95,25 +217,23 @@ export class IntelligentDiffAnalyzer {
         changeType
       );
       
-      // Generate git diff format using the diff library directly
       const gitDiffFormat = this.generateProperGitDiff(
         filePath,
         beforeContent,
         afterContent,
-        changeType
+        changeType,
+        changes
       );
       
       // Create line number mapping
-      const beforeLines = beforeContent.split('\n');
-      const afterLines = afterContent.split('\n');
       const lineNumberMapping = {
-        beforeLineCount: beforeLines.length,
-        afterLineCount: afterLines.length,
+        beforeLineCount: countLines(beforeContent),
+        afterLineCount: countLines(afterContent),
         exactLineNumbers: true,
         awsConsoleCompatible: true
       };
 
-      return {
+      const analysis: IntelligentDiff = {
         filePath,
         changeType,
         chunks,
@@ -122,22 +242,28 @@ export class IntelligentDiffAnalyzer {
         analysisRecommendation: recommendation,
         lineNumberMapping,
       };
+      if (cacheKey) {
+        this.analysisCache.set(cacheKey, analysis);
+      }
+
+      return analysis;
     } catch (error) {
+      // Credential, permission and throttling errors would fail every file alike;
+      // let them reach retryWithBackoff/handleAWSError instead of masking them
+      if (isRequestLevelError(error)) {
+        throw error;
+      }
       // Fallback analysis for files that couldn't be retrieved
       return this.createFallbackAnalysis(filePath, changeType, error);
     }
   }
 
   /**
-   * Performs intelligent line-by-line diff analysis using the diff library
+   * Performs intelligent line-by-line diff analysis on the diff library's line changes
    */
   private performLineDiffWithLibrary(
-    beforeContent: string,
-    afterContent: string
+    diff: LineChange[]
   ): { chunks: DiffChunk[], summary: { linesAdded: number, linesRemoved: number, linesModified: number, totalChanges: number } } {
-    // Use the diff library for accurate line-by-line comparison
-    const diff = Diff.diffLines(beforeContent, afterContent);
-    
     const chunks: DiffChunk[] = [];
     let beforeLineNum = 1;
     let afterLineNum = 1;
@@ -204,6 +330,126 @@ export class IntelligentDiffAnalyzer {
     };
   }
 
+  /**
+   * Runs diffLines on the region between the longest common line prefix and suffix.
+   * Identical leading/trailing lines are always part of an optimal diff, so stripping
+   * them first keeps the result minimal while shrinking the tokenize and diff work
+   * to the changed region.
+   */
+  private async diffLinesTrimmed(
+    beforeContent: string,
+    afterContent: string
+  ): Promise<LineChange[]> {
+    const maxCommon = Math.min(beforeContent.length, afterContent.length);
+
+    let prefixEnd = 0;
+    while (
+      prefixEnd < maxCommon &&
+      beforeContent.charCodeAt(prefixEnd) === afterContent.charCodeAt(prefixEnd)
+    ) {
+      prefixEnd++;
+    }
+    if (
+      prefixEnd > 0 &&
+      (prefixEnd < beforeContent.length || prefixEnd < afterContent.length)
+    ) {
+      // Only whole lines may be shared, so back up to just after the last newline
+      prefixEnd = beforeContent.lastIndexOf("\n", prefixEnd - 1) + 1;
+    }
+
+    let suffixLength = 0;
+    const maxSuffix = maxCommon - prefixEnd;
+    while (
+      suffixLength < maxSuffix &&
+      beforeContent.charCodeAt(beforeContent.length - 1 - suffixLength) ===
+        afterContent.charCodeAt(afterContent.length - 1 - suffixLength)
+    ) {
+      suffixLength++;
+    }
+    let suffix = beforeContent.slice(beforeContent.length - suffixLength);
+    if (
+      suffix &&
+      !(
+        this.isLineStart(
+          beforeContent,
+          beforeContent.length - suffixLength,
+          prefixEnd
+        ) &&
+        this.isLineStart(
+          afterContent,
+          afterContent.length - suffixLength,
+          prefixEnd
+        )
+      )
+    ) {
+      // The suffix must start on a line boundary in both versions
+      const newline = suffix.indexOf("\n");
+      suffix = newline === -1 ? "" : suffix.slice(newline + 1);
+    }
+
+    const prefix = beforeContent.slice(0, prefixEnd);
+    const changes: LineChange[] = [];
+    if (prefix) {
+      changes.push({ value: prefix });
+    }
+    changes.push(
+      ...(await this.diffLines(
+        beforeContent.slice(prefixEnd, beforeContent.length - suffix.length),
+        afterContent.slice(prefixEnd, afterContent.length - suffix.length)
+      ))
+    );
+    if (suffix) {
+      changes.push({ value: suffix });
+    }
+
+    return changes;
+  }
+
+  /**
+   * Large regions are diffed in jsdiff's callback mode, which computes the diff in
+   * setTimeout-sized steps so other tool calls keep being served meanwhile. Each step
+   * waits for a timer tick, so this trades latency for responsiveness; the timeout
+   * bounds that latency.
+   */
+  private diffLines(
+    before: string,
+    after: string
+  ): Promise<LineChange[]> {
+    // One empty side is a pure addition/removal; no alignment to compute
+    if (!before || !after) {
+      const changes: LineChange[] = [];
+      if (before) changes.push({ value: before, removed: true });
+      if (after) changes.push({ value: after, added: true });
+      return Promise.resolve(changes);
+    }
+
+    if (before.length + after.length < ASYNC_DIFF_THRESHOLD_CHARS) {
+      return Promise.resolve(Diff.diffLines(before, after));
+    }
+
+    return new Promise((resolve) => {
+      Diff.diffLines(before, after, {
+        timeout: ASYNC_DIFF_TIMEOUT_MS,
+        // undefined means the timeout hit; replacing the whole region is still a valid diff
+        callback: (changes) =>
+          resolve(
+            changes ?? [
+              { value: before, removed: true },
+              { value: after, added: true },
+            ]
+          ),
+      });
+    });
+  }
+
+  private isLineStart(
+    content: string,
+    index: number,
+    regionStart: number
+  ): boolean {
+    return index === regionStart || content[index - 1] === "\n";
+  }
+
   /**
    * Legacy method - kept for compatibility, now uses the library method
    */
@@ -309,9 +555,7 @@ export class IntelligentDiffAnalyzer {
 
     // Look for structural indicators
     const hasClassOrFunction = chunk.content.some((line) =>
-      /^(class|function|def|public|private|protected|async|export)/.test(
-        line.trim()
-      )
+      STRUCTURAL_DECLARATION_PATTERN.test(line)
     );
 
     if (hasClassOrFunction) return 5;
@@ -431,8 +675,8 @@ export class IntelligentDiffAnalyzer {
     afterContent: string,
     changeType: "A" | "D" | "M"
   ) {
-    const beforeLines = beforeContent.split("\n").length;
-    const afterLines = afterContent.split("\n").length;
+    const beforeLines = countLines(beforeContent);
+    const afterLines = countLines(afterContent);
     const totalChanges = chunks.filter((c) => c.type !== "context").length;
     const changeRatio = totalChanges / Math.max(beforeLines, afterLines, 1);
 
@@ -480,8 +724,8 @@ export class IntelligentDiffAnalyzer {
     // New or deleted files always need full context
     if (changeType === "A" || changeType === "D") return true;
 
-    const beforeLines = beforeContent.split("\n").length;
-    const afterLines = afterContent.split("\n").length;
+    const beforeLines = countLines(beforeContent);
+    const afterLines = countLines(afterContent);
 
     // Small files - show full content
     if (Math.max(beforeLines, afterLines) <= 500) return true;
@@ -493,11 +737,7 @@ export class IntelligentDiffAnalyzer {
 
     // Structural changes (imports, exports, class definitions)
     const hasStructuralChanges = chunks.some((chunk) =>
-      chunk.content.some((line) =>
-        /^(import|export|class|interface|function|def|from|package)/.test(
-          line.trim()
-        )
-      )
+      chunk.content.some((line) => STRUCTURAL_CHANGE_PATTERN.test(line))
     );
     if (hasStructuralChanges) return true;
 
@@ -550,28 +790,19 @@ export class IntelligentDiffAnalyzer {
     filePath: string,
     beforeContent: string,
     afterContent: string,
-    changeType: "A" | "D" | "M"
+    changeType: "A" | "D" | "M",
+    changes: LineChange[]
   ): string {
     // For new files (A) - show all content as added
     if (changeType === "A") {
-      const unifiedDiff = Diff.createPatch(
-        filePath,
-        "", // Empty before content
-        afterContent,
-        "/dev/null",
-        "b/" + filePath,
-        { context: 3 }
-      );
-      
-      // Replace the header to match git format
-      const lines = unifiedDiff.split('\n');
       const result = [
         `diff --git a/${filePath} b/${filePath}`,
         `new file mode 100644`,
         `index 0000000..${this.generateHashPlaceholder()}`,
         `--- /dev/null`,
         `+++ b/${filePath}`,
-        ...lines.slice(4) // Skip the createPatch header
+        ...this.wholeFileHunk(afterContent, "+"),
+        "",
       ];
       
       return result.join('\n');
@@ -579,52 +810,164 @@ export class IntelligentDiffAnalyzer {
     
     // For deleted files (D) - show all content as removed
     if (changeType === "D") {
-      const unifiedDiff = Diff.createPatch(
-        filePath,
-        beforeContent,
-        "", // Empty after content
-        "a/" + filePath,
-        "/dev/null",
-        { context: 3 }
-      );
-      
-      // Replace the header to match git format
-      const lines = unifiedDiff.split('\n');
       const result = [
         `diff --git a/${filePath} b/${filePath}`,
         `deleted file mode 100644`,
         `index ${this.generateHashPlaceholder()}..0000000`,
         `--- a/${filePath}`,
         `+++ /dev/null`,
-        ...lines.slice(4) // Skip the createPatch header
+        ...this.wholeFileHunk(beforeContent, "-"),
+        "",
       ];
       
       return result.join('\n');
     }
     
-    // For modified files (M) - show the actual diff
-    const unifiedDiff = Diff.createPatch(
-      filePath,
-      beforeContent,
-      afterContent,
-      "a/" + filePath,
-      "b/" + filePath,
-      { context: 3 }
-    );
-    
-    // Replace the header to match git format
-    const lines = unifiedDiff.split('\n');
+    // For modified files (M) - show the actual diff, built from the changes already computed
     const result = [
       `diff --git a/${filePath} b/${filePath}`,
       `index ${this.generateHashPlaceholder()}..${this.generateHashPlaceholder()} 100644`,
       `--- a/${filePath}`,
       `+++ b/${filePath}`,
-      ...lines.slice(4) // Skip the createPatch header
+      ...this.buildUnifiedHunks(changes),
+      "",
     ];
     
     return result.join('\n');
   }
 
+  /**
+   * Formats line changes as unified diff hunks the way jsdiff's structuredPatch and
+   * formatPatch do, so the patch reuses the diff instead of running a second one.
+   */
+  private buildUnifiedHunks(changes: LineChange[]): string[] {
+    // Merge neighbouring parts of one kind (the trimmed prefix or suffix next to an
+    // unchanged run of the middle diff) so context and hunk breaks see whole runs
+    const parts: Array<{ lines: string[]; added?: boolean; removed?: boolean }> = [];
+    for (const change of changes) {
+      const lines = this.splitLinesKeepingNewlines(change.value);
+      const last = parts[parts.length - 1];
+      if (last && !last.added === !change.added && !last.removed === !change.removed) {
+        last.lines.push(...lines);
+      } else {
+        parts.push({ lines, added: change.added, removed: change.removed });
+      }
+    }
+    parts.push({ lines: [] });
+
+    const context = UNIFIED_DIFF_CONTEXT_LINES;
+    const hunks: Array<{ oldStart: number; oldLines: number; newStart: number; newLines: number; lines: string[] }> = [];
+    let oldRangeStart = 0;
+    let newRangeStart = 0;
+    let curRange: string[] = [];
+    let oldLine = 1;
+    let newLine = 1;
+
+    for (let i = 0; i < parts.length; i++) {
+      const { lines, added, removed } = parts[i];
+      if (added || removed) {
+        // A new hunk starts with the trailing context of the unchanged run before it
+        if (!oldRangeStart) {
+          oldRangeStart = oldLine;
+          newRangeStart = newLine;
+          if (i > 0) {
+            curRange = parts[i - 1].lines.slice(-context).map(line => " " + line);
+            oldRangeStart -= curRange.length;
+            newRangeStart -= curRange.length;
+          }
+        }
+        for (const line of lines) {
+          curRange.push((added ? "+" : "-") + line);
+        }
+        if (added) {
+          newLine += lines.length;
+        } else {
+          oldLine += lines.length;
+        }
+      } else {
+        if (oldRangeStart) {
+          if (lines.length <= context * 2 && i < parts.length - 2) {
+            // Short unchanged run between changes: keep it and extend the hunk
+            for (const line of lines) {
+              curRange.push(" " + line);
+            }
+          } else {
+            const contextSize = Math.min(lines.length, context);
+            for (const line of lines.slice(0, contextSize)) {
+              curRange.push(" " + line);
+            }
+            hunks.push({
+              oldStart: oldRangeStart,
+              oldLines: oldLine - oldRangeStart + contextSize,
+              newStart: newRangeStart,
+              newLines: newLine - newRangeStart + contextSize,
+              lines: curRange,
+            });
+            oldRangeStart = 0;
+            newRangeStart = 0;
+            curRange = [];
+          }
+        }
+        oldLine += lines.length;
+        newLine += lines.length;
+      }
+    }
+
+    const output: string[] = [];
+    for (const hunk of hunks) {
+      // Unified diff quirk: an empty range starts one line lower than expected
+      const oldStart = hunk.oldLines === 0 ? hunk.oldStart - 1 : hunk.oldStart;
+      const newStart = hunk.newLines === 0 ? hunk.newStart - 1 : hunk.newStart;
+      output.push(`@@ -${oldStart},${hunk.oldLines} +${newStart},${hunk.newLines} @@`);
+      for (const line of hunk.lines) {
+        // Only a file's last line can lack its newline; git marks that explicitly
+        if (line.endsWith("\n")) {
+          output.push(line.slice(0, -1));
+        } else {
+          output.push(line, "\\ No newline at end of file");
+        }
+      }
+    }
+    return output;
+  }
+
+  private splitLinesKeepingNewlines(text: string): string[] {
+    const lines: string[] = [];
+    let start = 0;
+    while (start < text.length) {
+      const newline = text.indexOf("\n", start);
+      const end = newline === -1 ? text.length : newline + 1;
+      lines.push(text.slice(start, end));
+      start = end;
+    }
+    return lines;
+  }
+
+  /**
+   * Builds the single hunk of an added or deleted file directly; with one side empty
+   * there is nothing for a diff algorithm to align.
+   */
+  private wholeFileHunk(content: string, sign: "+" | "-"): string[] {
+    if (!content) return [];
+
+    const lines = content.split("\n");
+    const endsWithNewline = lines[lines.length - 1] === "";
+    if (endsWithNewline) lines.pop();
+
+    const hunk = [
+      sign === "+"
+        ? `@@ -0,0 +1,${lines.length} @@`
+        : `@@ -1,${lines.length} +0,0 @@`,
+    ];
+    for (const line of lines) {
+      hunk.push(sign + line);
+    }
+    if (!endsWithNewline) {
+      hunk.push("\\ No newline at end of file");
+    }
+    return hunk;
+  }
+
   /**
    * Generates a placeholder hash for git diff (simplified)
    */
@@ -699,6 +1042,39 @@ export class IntelligentDiffAnalyzer {
     return diffOutput.join('\n');
   }
 
+  /**
+   * Creates the analysis for a binary file, which has no line-level diff
+   */
+  private createBinaryFileAnalysis(
+    filePath: string,
+    changeType: "A" | "D" | "M"
+  ): IntelligentDiff {
+    return {
+      filePath,
+      changeType,
+      chunks: [],
+      gitDiffFormat: `Binary file ${filePath} differs`,
+      summary: {
+        linesAdded: 0,
+        linesRemoved: 0,
+        linesModified: 0,
+        totalChanges: 0,
+      },
+      analysisRecommendation: {
+        needsFullFile: false,
+        reason: "Binary file - line-level diff is not available",
+        contextLines: 0,
+        complexity: "low",
+      },
+      lineNumberMapping: {
+        beforeLineCount: 0,
+        afterLineCount: 0,
+        exactLineNumbers: false,
+        awsConsoleCompatible: false
+      },
+    };
+  }
+
   /**
    * Creates fallback analysis when file retrieval fails
    */
@@ -763,18 +1139,31 @@ export class IntelligentDiffAnalyzer {
       )
     );
 
+    // One pass over the analyses instead of a filter per statistic
+    let fullFileNeeded = 0;
+    const complexFiles: string[] = [];
+    const simpleFiles: string[] = [];
+    for (const analysis of analyses) {
+      const { needsFullFile, complexity } = analysis.analysisRecommendation;
+      if (needsFullFile) {
+        fullFileNeeded++;
+      }
+      if (complexity === "high") {
+        complexFiles.push(analysis.filePath);
+      } else if (complexity === "low") {
+        simpleFiles.push(analysis.filePath);
+      }
+    }
+
     const batchRecommendations = {
       totalFiles: analyses.length,
-      fullFileNeeded: analyses.filter(
-        (a) => a.analysisRecommendation.needsFullFile
-      ).length,
-      complexFiles: analyses
-        .filter((a) => a.analysisRecommendation.complexity === "high")
-        .map((a) => a.filePath),
-      simpleFiles: analyses
-        .filter((a) => a.analysisRecommendation.complexity === "low")
-        .map((a) => a.filePath),
-      approachSummary: this.generateBatchApproachSummary(analyses),
+      fullFileNeeded,
+      complexFiles,
+      simpleFiles,
+      approachSummary: this.generateBatchApproachSummary(
+        fullFileNeeded,
+        analyses.length
+      ),
     };
 
     return { analyses, batchRecommendations };
@@ -783,12 +1172,10 @@ export class IntelligentDiffAnalyzer {
   /**
    * Generates a summary of recommended approaches for the batch
    */
-  private generateBatchApproachSummary(analyses: IntelligentDiff[]): string {
-    const fullFileCount = analyses.filter(
-      (a) => a.analysisRecommendation.needsFullFile
-    ).length;
-    const totalFiles = analyses.length;
-    
+  private generateBatchApproachSummary(
+    fullFileCount: number,
+    totalFiles: number
+  ): string {
     let summary = "";
     
     if (fullFileCount === totalFiles) {
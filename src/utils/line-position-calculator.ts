@@ -1,4 +1,5 @@
 import { RepositoryService } from '../services/repository-service.js';
+import { getLineStarts, sliceFileLines } from './file-content.js';
 
 /**
  * Utility for calculating and validating line positions for AWS CodeCommit comments
@@ -31,8 +32,7 @@ export class LinePositionCalculator {
         filePath
       );
 
-      const lines = fileData.content.split('\n');
-      const totalLines = lines.length;
+      const totalLines = getLineStarts(fileData).length;
 
       console.error(`Line validation for ${filePath}:`, {
         requestedLine: lineNumber,
@@ -88,9 +88,11 @@ export class LinePositionCalculator {
     }
 
     try {
-      // Get both file versions
-      const beforeFile = await this.repositoryService.getFile(repositoryName, beforeCommit, filePath);
-      const afterFile = await this.repositoryService.getFile(repositoryName, afterCommit, filePath);
+      // Get both file versions concurrently
+      const [beforeFile, afterFile] = await Promise.all([
+        this.repositoryService.getFile(repositoryName, beforeCommit, filePath),
+        this.repositoryService.getFile(repositoryName, afterCommit, filePath),
+      ]);
 
       const beforeLines = beforeFile.content.split('\n');
       const afterLines = afterFile.content.split('\n');
@@ -229,8 +231,7 @@ export class LinePositionCalculator {
         filePath
       );
 
-      const lines = fileData.content.split('\n');
-      const totalLines = lines.length;
+      const totalLines = getLineStarts(fileData).length;
 
       console.error(`Mapping AI line ${aiLineNumber} to CodeCommit position:`, {
         filePath,
@@ -281,13 +282,13 @@ export class LinePositionCalculator {
         filePath
       );
 
-      const lines = fileData.content.split('\n');
-      const sampleLines = lines.slice(0, 20).map((line, index) => 
+      const totalLines = getLineStarts(fileData).length;
+      const sampleLines = sliceFileLines(fileData, 1, Math.min(20, totalLines)).map((line, index) => 
         `${index + 1}: ${line.substring(0, 100)}${line.length > 100 ? '...' : ''}`
       );
 
       return {
-        totalLines: lines.length,
+        totalLines,
         sampleLines
       };
     } catch (error) {